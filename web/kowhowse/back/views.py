@@ -148,7 +148,7 @@ class IndexView(TemplateView):
 
     @property
     def surveys(self):
-        return Survey.objects.all()
+        return Survey.objects.select_related('stats')
 
 
 class AnalysisView(TemplateView):
@@ -185,17 +185,19 @@ class AnalysisView(TemplateView):
         #   'respondent'
         # }
 
-        def response_to_dict(r):
+        def response_to_dict(f):
             return {
-                'species': r.feed.species.replace('Feed', '').lower(),
-                'id': r.id,
+                'species': f.species.replace('Feed', '').lower(),
+                'id': f.page.id,
                 # value in terms of accuracy
-                'respondent': r.feed.page.subject.id
+                'respondent': f.page.subject_id
             }
 
         kwargs['responses'] = json.dumps(
-            [response_to_dict(p)
-             for p in self.survey.pages.exclude(feed__species='SectionFeed')],
+            [response_to_dict(f)
+             for f in resolve(self.survey.pages
+                                  .exclude(subject__pooled=True)
+                                  .exclude(feed__species='SectionFeed'))],
             cls=DjangoJSONEncoder
         )
         # kwargs['responses'] = json.dumps(
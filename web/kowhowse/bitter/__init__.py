@@ -1,6 +1,8 @@
 from .definition import *
 from .instantiation import *
 from .response import *
+from .resolution import *
+from .registry import *
 from .signals import *
 
 
@@ -7,7 +7,17 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator, MinValueValidator
 from django.utils.translation import gettext_lazy as _
 import os
-from pickle import dumps, loads
+import json
+import wave
+import shutil
+import hashlib
+import subprocess
+from base64 import b64encode
+from collections import namedtuple
+from random import randrange
+
+from .instruction import instructions
+from .validation import pipeline
 
 
 class Describable(models.Model):
@@ -28,15 +38,33 @@ class Instructable(models.Model):
 
     @property
     def instruction_content(self):
-        if not hasattr(self, '_content'):
-            with open(self.instruction.path) as f:
-                self._content = f.read()
-        return self._content
+        return instructions.get(self.instruction.path).content
+
+    @property
+    def instruction_html(self):
+        return instructions.get(self.instruction.path).html
 
     def instruction_is_html(self):
         return os.path.splitext(self.instruction.path)[1] == '.html'
 
 
+def generate_uid():
+    """
+    A random URL-safe uid that no survey has yet.
+    """
+    def uid():
+        return b64encode(
+            randrange(64**Survey.UID_LENGTH)\
+            .to_bytes(-(-Survey.UID_LENGTH * 6 // 8), byteorder='big')
+        )\
+        .decode('ascii').replace('+', '-').replace('/', '_')
+
+    u = uid()
+    while Survey.objects.filter(uid=u).exists():
+        u = uid()
+    return u
+
+
 class Survey(Describable, Instructable):
     UID_LENGTH = 4
 
@@ -46,40 +74,146 @@ class Survey(Describable, Instructable):
     uid = models.CharField(
         validators=[MinLengthValidator(UID_LENGTH)],
         max_length=UID_LENGTH,
-        primary_key=True
+        primary_key=True,
+        default=generate_uid
     )
 
     @property
     def num_sections(self):
         return self.sections.exclude(dummy=True).count()
 
+    @property
+    def questions(self):
+        return Question.objects\
+            .filter(section__survey=self)\
+            .order_by('section_id', 'id')
+
+    def question_index(self):
+        """
+        Questions of the survey in order, as their concrete types.
+        All question tables are joined in one query; relations named by
+        prefetch_related on each type take one more query each.
+        """
+        if not hasattr(self, '_question_index'):
+            species = [c.__name__.lower() for c in Question.__subclasses__()]
+            self._question_index = [
+                getattr(question, question.species.lower())
+                for question in self.questions
+                .select_related(*species)
+                .prefetch_related(*(
+                    f'{s}__{r}'
+                    for s, c in zip(species, Question.__subclasses__())
+                    for r in c.prefetch_related
+                ))
+            ]
+        return self._question_index
+
     @property
     def num_questions(self):
-        return sum(len(getattr(section, attribute).all())
-                   for section in self.sections.exclude(dummy=True)
-                   for attribute in dir(section) if 'questions' in attribute)
+        return self.questions.exclude(section__dummy=True).count()
 
     @property
     def num_subjects(self):
-        return self.subjects.count()
+        return self.stats.num_subjects
 
     @property
     def num_incomplete(self):
-        return len([s for s in self.subjects.all() if not s.is_complete])
+        return self.stats.num_subjects - self.stats.num_complete
 
     @property
     def num_complete(self):
-        return len([s for s in self.subjects.all() if s.is_complete])
+        return self.stats.num_complete
 
     @property
     def url(self):
         return ''
 
 
+class SurveyStats(models.Model):
+    """
+    Running counts for a survey, updated as subjects start and respond so
+    that the backroom doesn't have to go through every subject.
+    """
+    survey = models.OneToOneField(
+        Survey,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        primary_key=True
+    )
+    num_subjects = models.PositiveIntegerField(default=0)
+    num_complete = models.PositiveIntegerField(default=0)
+    # Answered responses per question type
+    num_ab_responses = models.PositiveIntegerField(default=0)
+    num_abx_responses = models.PositiveIntegerField(default=0)
+    num_mos_responses = models.PositiveIntegerField(default=0)
+    num_mushra_responses = models.PositiveIntegerField(default=0)
+
+    @staticmethod
+    def responses_field(species):
+        return 'num_{}_responses'.format(species.replace('Feed', '').lower())
+
+    @staticmethod
+    def count(survey, **deltas):
+        SurveyStats.objects.filter(survey=survey).update(**{
+            k: models.F(k) + v for k, v in deltas.items() if v
+        })
+
+
 class System(Describable):
     pass
 
 
+AudioSource = namedtuple('AudioSource', ['name', 'type'])
+
+
+def probe_audio(path):
+    """
+    Metadata of the audio file at path as Audio field values.
+    WAV files are read with the wave module; other formats are left to
+    ffprobe when it is installed, and otherwise only get a size and checksum.
+    """
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            checksum.update(chunk)
+    meta = {
+        'mime_type': 'audio/' + str(path).split('.')[-1],
+        'size': os.path.getsize(path),
+        'checksum': checksum.hexdigest(),
+        'duration': None,
+        'sample_rate': None,
+        'channels': None
+    }
+
+    try:
+        with wave.open(str(path), 'rb') as w:
+            meta['sample_rate'] = w.getframerate()
+            meta['channels'] = w.getnchannels()
+            meta['duration'] = w.getnframes() / w.getframerate()
+        return meta
+    except (wave.Error, EOFError):
+        pass
+
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe is not None:
+        try:
+            out = subprocess.run(
+                [ffprobe, '-v', 'error', '-select_streams', 'a:0',
+                 '-show_entries', 'stream=sample_rate,channels:format=duration',
+                 '-of', 'json', str(path)],
+                capture_output=True, check=True, timeout=60
+            ).stdout
+            info = json.loads(out)
+            stream = info['streams'][0]
+            meta['sample_rate'] = int(stream['sample_rate'])
+            meta['channels'] = int(stream['channels'])
+            meta['duration'] = float(info['format']['duration'])
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError,
+                IndexError):
+            pass
+    return meta
+
+
 class Audio(Describable):
     REFERENCE = 'R'
     ANCHOR = 'A'
@@ -104,8 +238,46 @@ class Audio(Describable):
         default=STIMULUS
     )
 
+    # Probed once by createsurvey; see probe_audio
+    mime_type = models.CharField(max_length=50, blank=True, db_index=True)
+    size = models.PositiveIntegerField(null=True, db_index=True)
+    checksum = models.CharField(max_length=64, blank=True, db_index=True)
+    duration = models.FloatField(null=True, db_index=True)
+    sample_rate = models.PositiveIntegerField(null=True, db_index=True)
+    channels = models.PositiveSmallIntegerField(null=True, db_index=True)
+
+    # Compressed copies of data as JSON [format, name, MIME type, size] lists,
+    # smallest first; see logic.encoding
+    variants = models.TextField(default='[]')
+
     def data_format(self):
-        return 'audio/' + self.data.path.split('.')[-1]
+        return self.mime_type or 'audio/' + self.data.name.split('.')[-1]
+
+    def variant_list(self):
+        return json.loads(self.variants)
+
+    def set_variant_list(self, variants):
+        self.variants = json.dumps(sorted(variants, key=lambda v: v[3]))
+
+    def sources(self):
+        """
+        Files to offer the browser, smallest first so that it plays the
+        smallest one it supports, ending with the original.
+        """
+        return [
+            AudioSource(name, mime_type)
+            for _, name, mime_type, _ in self.variant_list()
+        ] + [AudioSource(self.data.name, self.data_format())]
+
+    def prefetch_source(self):
+        """
+        The source to hint to the browser ahead of time: the smallest of FLAC
+        and the original, which every browser plays, unlike e.g. Opus.
+        """
+        return next(
+            source for source in self.sources()
+            if source.type in ('audio/flac', self.data_format())
+        )
 
 
 class Section(Describable, Instructable):
@@ -116,6 +288,11 @@ class Section(Describable, Instructable):
     )
     dummy = models.BooleanField()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.dummy is None:
+            self.dummy = self.__class__.__name__ == 'End'
+
 
 class End(Section):
     class Meta:
@@ -137,27 +314,39 @@ class Question(Describable, Instructable):
         related_name='%(class)ss'
     )
     samples = models.ManyToManyField(Audio, related_name='%(class)ss')
-    validators = models.BinaryField()
+    # JSON list of names of validators registered in bitter.validation
+    validators = models.TextField()
+
+    # Relations fetched along with the question by resolve
+    select_related = ()
+    prefetch_related = ('samples',)
+    # Validators of new questions of this type
+    default_validators = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.species:
+            self.species = self.__class__.__name__
+        if not self.validators:
+            self.validators = json.dumps(self.default_validators)
 
     def cast(self):
-        return {
-            'AbQuestion': AbQuestion,
-            'AbxQuestion': AbxQuestion,
-            'MushraQuestion': MushraQuestion,
-            'MosQuestion': MosQuestion
-        }[self.species].objects.get(pk=self.id)
+        if self.__class__.__name__ == self.species:
+            return self
+        from .resolution import resolve
+        return resolve([self])[0]
 
     @property
-    def restored_validators(self):
-        yield from loads(self.validators)
+    def pipeline(self):
+        return pipeline(self.validators)
 
 
 class AbQuestion(Question):
-    pass
+    default_validators = ('validate_required', 'validate_ab')
 
 
 class AbxQuestion(Question):
-    pass
+    default_validators = ('validate_required', 'validate_ab')
 
 
 class MushraQuestion(Question):
@@ -173,6 +362,12 @@ class MushraQuestion(Question):
         null=True
     )
 
+    default_validators = (
+        'validate_required',
+        'validate_mushra_below_10',
+        'validate_mushra_above_90'
+    )
+
     @property
     def references(self):
         return self.samples.filter(role='R')
@@ -226,13 +421,15 @@ class MosScale(Describable):
 
     def __getitem__(self, key):
         if not hasattr(self, '_mapping'):
-            self._mapping = list(
-                self.levels.order_by('value')
+            # Sorted here so that prefetched levels can be used
+            self._mapping = sorted(
+                self.levels.all(),
+                key=lambda level: level.value
             )
         return self._mapping[key]
 
     def choices(self):
-        for k in range(self.levels.all().count()):
+        for k in range(len(self.levels.all())):
             yield self[k]
 
     @property
@@ -246,6 +443,9 @@ class MosQuestion(Question):
         related_name='%(class)ss'
     )
 
+    prefetch_related = ('samples', 'scales')
+    default_validators = ('validate_required',)
+
     def clean(self):
         if len(self.scales) == 0:
             raise ValidationError(
@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from random import Random
+import sys
+import json
+from random import Random, randint
 from .definition import *
+from .registry import scale_registry
+
+
+def random_seed():
+    return randint(-sys.maxsize - 1, sys.maxsize)
 
 
 class Subject(Describable):
@@ -11,34 +18,118 @@ class Subject(Describable):
         on_delete=models.CASCADE,
         related_name='subjects'
     )
+    # Allocated ahead of time and waiting to be claimed by a listener
+    pooled = models.BooleanField(default=False)
+    # JSON list of pages yet to be materialized for lazily allocated subjects;
+    # see logic.allocation
+    plan = models.TextField(null=True)
+    # Position of the current page
+    cursor = models.PositiveIntegerField(default=0)
+    num_pages = models.PositiveIntegerField(default=0)
+    # Completion kept up to date as responses are cooked
+    num_questions = models.PositiveIntegerField(default=0)
+    num_answered = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+
+    @property
+    def planned_pages(self):
+        if self.plan is None:
+            return None
+        if not hasattr(self, '_planned_pages'):
+            self._planned_pages = json.loads(self.plan)
+        return self._planned_pages
+
+    def materialize(self, position):
+        from ..logic.allocation import materialize
+        return materialize(self, position)
+
+    def page_at(self, position):
+        page = self.pages.filter(position=position).first()
+        if page is None:
+            page = self.materialize(position)
+        return page
+
+    @property
+    def current_page(self):
+        return self.page_at(self.cursor)
 
     @property
     def current_feed(self):
-        page = self.pages.get(is_current=True)
-        return page.feed
+        from .resolution import resolve
+        feeds = resolve(
+            self.pages.filter(position=self.cursor, feed__isnull=False)
+        )
+        if not feeds:
+            feeds = resolve([self.materialize(self.cursor).feed])
+        return feeds[0]
+
+    def samples_at(self, position):
+        """
+        Audio played on the page at position, without materializing it.
+        """
+        if self.plan is not None:
+            if not 0 <= position < len(self.planned_pages):
+                return Audio.objects.none()
+            return Audio.objects.filter(id__in=self.planned_pages[position][3])
+        # Look up the feed first so that only its own samples are queried,
+        # by feed id, rather than joining every feed table
+        feed = self.pages.filter(position=position)\
+                         .values_list('feed__id', 'feed__species').first()
+        if feed is None:
+            return Audio.objects.none()
+        id, species = feed
+        if species == 'MosFeed':
+            return Audio.objects.filter(mos_feeds__id=id)
+        if species in ('AbFeed', 'AbxFeed', 'MushraFeed'):
+            return Audio.objects.filter(**{f'{species.lower()}s__id': id})
+        return Audio.objects.none()
+
+    def flip_to(self, position):
+        if 0 <= position < self.num_pages and position != self.cursor:
+            self.cursor = position
+            self.save(update_fields=['cursor'])
 
     def flip_next(self):
-        current = self.pages.get(is_current=True)
-        if current.next_page is not None:
-            current.is_current = False
-            current.save()
-            current.next_page.is_current = True
-            current.next_page.save()
+        self.flip_to(self.cursor + 1)
 
     def flip_prev(self):
-        current = self.pages.get(is_current=True)
-        if current.prev_page is not None:
-            current.is_current = False
-            current.save()
-            current.prev_page.is_current = True
-            current.prev_page.save()
+        self.flip_to(self.cursor - 1)
+
+    @property
+    def progress(self):
+        """
+        Percentage of pages before the current one.
+        """
+        if not self.num_pages:
+            return 0
+        return 100 * self.cursor // self.num_pages
 
     @property
     def is_complete(self):
-        for page in self.pages.all():
-            if not page.is_complete:
-                return False
-        return True
+        return self.completed
+
+    @staticmethod
+    def tally(page, species, delta):
+        """
+        Count delta more answered responses of species for the subject of
+        page and its survey.
+        """
+        with transaction.atomic():
+            # Incremented in the database so that concurrent cooks for the
+            # subject don't lose updates; the update also locks the row, so
+            # completion is read back from the count as updated
+            subjects = Subject.objects.filter(pages=page)
+            subjects.update(num_answered=models.F('num_answered') + delta)
+            subject = subjects.get()
+            completed = subject.num_answered >= subject.num_questions
+            flipped = Subject.objects.filter(
+                pk=subject.pk, completed=not completed
+            ).update(completed=completed)
+            SurveyStats.count(
+                subject.survey_id,
+                **{SurveyStats.responses_field(species): delta},
+                num_complete=flipped * (1 if completed else -1)
+            )
 
 
 class Page(models.Model):
@@ -46,6 +137,9 @@ class Page(models.Model):
     An unforunate handle object for feed-like objects.
     This is what's used to string together questions of different types.
     """
+    class Meta:
+        unique_together = ('subject', 'position')
+
     survey = models.ForeignKey(
         Survey,
         on_delete=models.CASCADE,
@@ -56,30 +150,19 @@ class Page(models.Model):
         on_delete=models.CASCADE,
         related_name='pages'
     )
-    prev_page = models.OneToOneField(
-        'self',
-        on_delete=models.CASCADE,
-        related_name='prev',
-        null=True
-    )
-    next_page = models.OneToOneField(
-        'self',
-        on_delete=models.CASCADE,
-        related_name='next',
-        null=True
-    )
-    is_current = models.BooleanField(default=False)
+    position = models.PositiveIntegerField()
 
     @property
     def is_complete(self):
         return self.feed.is_complete
 
-    # FIXME No longer using NullFeed
-    def is_effectively_first(self):
-        return self.prev_page.feed.species == 'NullFeed'
+    @property
+    def is_first(self):
+        return self.position == 0
 
-    def is_effectively_last(self):
-        return self.next_page.feed.species == 'NullFeed'
+    @property
+    def is_last(self):
+        return self.position == self.subject.num_pages - 1
 
 
 class Feed(models.Model):
@@ -91,15 +174,20 @@ class Feed(models.Model):
         null=True
     )
 
+    # Relations fetched along with the feed by resolve
+    select_related = ('page',)
+    prefetch_related = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.species:
+            self.species = self.__class__.__name__
+
     def cast(self):
-        return {
-            'SectionFeed': SectionFeed,
-            'AbFeed': AbFeed,
-            'AbxFeed': AbxFeed,
-            'MushraFeed': MushraFeed,
-            'MosFeed': MosFeed,
-            'EndFeed': EndFeed
-        }[self.species].objects.get(pk=self.id)
+        if self.__class__.__name__ == self.species:
+            return self
+        from .resolution import resolve
+        return resolve([self])[0]
 
     @property
     def is_complete(self):
@@ -113,6 +201,8 @@ class SectionFeed(Feed):
         related_name='feeds'
     )
 
+    select_related = ('page', 'section')
+
     @property
     def is_complete(self):
         return True
@@ -122,7 +212,9 @@ class QuestionFeed(Feed):
     class Meta:
         abstract = True
 
-    seed = models.IntegerField()
+    seed = models.IntegerField(default=random_seed)
+
+    select_related = ('page', 'question', 'response')
 
     @property
     def is_complete(self):
@@ -135,6 +227,36 @@ class PreferenceFeed(QuestionFeed):
         abstract = True
 
     samples = models.ManyToManyField(Audio, related_name='%(class)ss')
+    # Comma-separated ids of samples in presentation order, fixed by shuffle
+    # at allocation
+    mapping = models.TextField(default='')
+
+    prefetch_related = ('samples',)
+
+    def shuffle(self, samples):
+        """
+        samples in presentation order, as determined by the seed.
+        """
+        raise NotImplementedError
+
+    def map(self, samples):
+        # Shuffled from id order, so that the seed and samples alone
+        # reproduce the mapping whatever order the samples come in
+        self.mapping = ','.join(
+            str(sample.id)
+            for sample in self.shuffle(sorted(samples, key=lambda s: s.id))
+        )
+
+    @property
+    def order(self):
+        if not hasattr(self, '_order'):
+            samples = {sample.id: sample for sample in self.samples.all()}
+            if not self.mapping:
+                self.map(samples.values())
+            self._order = [
+                samples[int(id)] for id in self.mapping.split(',')
+            ]
+        return self._order
 
     def clean(self):
         for sample in self.samples:
@@ -164,12 +286,11 @@ class AbFeed(PreferenceFeed):
             )
         super().clean()
 
+    def shuffle(self, samples):
+        return Random(self.seed).sample(samples, 2)
+
     def __getitem__(self, key):
-        if not hasattr(self, '_mapping'):
-            r = Random(self.seed)
-            self._mapping = dict(
-                zip('AB', r.sample(list(self.samples.all()), 2)))
-        return self._mapping[key]
+        return dict(zip('AB', self.order))[key]
 
     def choices(self):
         for k in 'AB':
@@ -190,11 +311,12 @@ class AbxFeed(PreferenceFeed):
             )
         super().clean()
 
-    def __getitem__(self, key):
+    def shuffle(self, samples):
         r = Random(self.seed)
-        mapping = dict(zip('AB', r.sample(list(self.samples.all()), 2)))
-        mapping = {**mapping, 'X': r.choice(list(self.samples.all()))}
-        return mapping[key]
+        return r.sample(samples, 2) + [r.choice(samples)]
+
+    def __getitem__(self, key):
+        return dict(zip('ABX', self.order))[key]
 
     def choices(self):
         for k in 'AB':
@@ -208,6 +330,8 @@ class MushraFeed(PreferenceFeed):
         related_name='feeds'
     )
 
+    prefetch_related = ('samples', 'response__bits')
+
     def clean(self):
         PreferenceFeed.clean(self)
         if self.samples.filter(role='R').count() == 1:
@@ -215,33 +339,35 @@ class MushraFeed(PreferenceFeed):
         elif self.samples.filter(role='A').count() < 1:
             raise ValidationError(_('At least one anchor required'))
 
+    def shuffle(self, samples):
+        return Random(self.seed).sample(samples, len(samples))
+
     def __getitem__(self, key):
-        if not hasattr(self, '_mapping'):
-            r = Random(self.seed)
-            m = self.samples.all()
-            self._mapping = r.sample(list(m), m.count())
-        return self._mapping[key]
+        return self.order[key]
 
     @property
     def reference(self):
-        if not hasattr(self, '_reference'):
-            self._reference = self.samples.get(role='R')
-        return self._reference
+        return next(
+            sample for sample in self.samples.all()
+            if sample.role == Audio.REFERENCE
+        )
 
     @property
     def anchors(self):
-        if not hasattr(self, '_anchors'):
-            self._anchors = self.samples.filter(role='A')
-        return self._anchors
+        return [
+            sample for sample in self.samples.all()
+            if sample.role == Audio.ANCHOR
+        ]
 
     @property
     def stimuli(self):
-        if not hasattr(self, '_stimuli'):
-            self._stimuli = self.samples.filter(role='S')
-        return self._stimuli
+        return [
+            sample for sample in self.samples.all()
+            if sample.role == Audio.STIMULUS
+        ]
 
     def choices(self):
-        for k in range(self.samples.all().count()):
+        for k in range(len(self.order)):
             yield k, self[k]
 
 
@@ -256,19 +382,20 @@ class MosFeed(QuestionFeed):
         Audio, on_delete=models.CASCADE, related_name='mos_feeds'
     )
 
+    select_related = ('page', 'question', 'response', 'sample')
+    prefetch_related = ('response__bits',)
+
     def clean(self):
         if self.sample not in self.question.samples:
             raise ValidationError(_('Invalid sample'))
 
     def __getitem__(self, key):
         if not hasattr(self, '_mapping'):
-            self._mapping = list(
-                self.question.scales.order_by('-id')
-            )
+            self._mapping = scale_registry.scales(self.question_id)[::-1]
         return self._mapping[key]
 
     def scales(self):
-        for k in range(self.question.scales.all().count()):
+        for k in range(len(scale_registry.scales(self.question_id))):
             yield self[k]
 
 
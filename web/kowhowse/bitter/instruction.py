@@ -0,0 +1,84 @@
+"""
+Process-wide cache of instruction files.
+"""
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+
+Instruction = namedtuple('Instruction', ['content', 'html'])
+
+
+class InstructionCache:
+    """
+    Contents of instruction files together with their HTML rendering, keyed
+    by path and modification time so that edited files are read again.
+    The least recently used files are evicted beyond max_entries.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._warm = set()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(path) as f:
+            content = f.read()
+        instruction = Instruction(
+            content,
+            mark_safe(content if os.path.splitext(path)[1] == '.html'
+                      else escape(content))
+        )
+
+        with self._lock:
+            self._entries[path] = (mtime, instruction)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return instruction
+
+    def warm(self, survey):
+        """
+        Load the instructions of survey and all its sections and questions,
+        once per survey and process; files edited later are picked up by get.
+        """
+        with self._lock:
+            if survey.uid in self._warm:
+                return
+            self._warm.add(survey.uid)
+        for instructable in [survey, *survey.sections.all(),
+                             *survey.question_index()]:
+            if instructable.instruction:
+                try:
+                    self.get(instructable.instruction.path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._warm.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+instructions = InstructionCache(
+    getattr(settings, 'INSTRUCTION_CACHE_SIZE', 1024)
+)
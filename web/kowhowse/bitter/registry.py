@@ -0,0 +1,76 @@
+"""
+Process-wide registry of MOS scales and levels.
+"""
+import threading
+
+from .definition import MosQuestion, MosScale
+
+
+class ScaleRegistry:
+    """
+    All MOS scales with their levels, and the scales of each MOS question,
+    loaded once per process. Scales don't change once a survey is created, so
+    the registry is only reloaded when those tables are saved in this process
+    (see signals) or when first asked for a question or scale it hasn't seen,
+    e.g. one created by another process. Ids still missing after that reload
+    are remembered so that asking again doesn't reload.
+    """
+    def __init__(self):
+        self._scales = None
+        self._questions = None
+        self._levels = None
+        # (table, key) pairs that were still missing after a reload
+        self._missing = set()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        scales = {
+            scale.id: scale
+            for scale in MosScale.objects.prefetch_related('levels')
+        }
+        questions = {}
+        for question_id, scale_id in MosQuestion.scales.through.objects\
+                .order_by('mosscale_id')\
+                .values_list('mosquestion_id', 'mosscale_id'):
+            questions.setdefault(question_id, []).append(scales[scale_id])
+        # Levels are sorted once, here, rather than on every use
+        levels = {
+            scale.id: {level.id: level for level in scale.choices()}
+            for scale in scales.values()
+        }
+        self._scales, self._questions, self._levels = \
+            scales, questions, levels
+        self._missing = set()
+
+    def _get(self, table, key):
+        with self._lock:
+            if self._scales is None or \
+               key not in getattr(self, table) and \
+               (table, key) not in self._missing:
+                self._load()
+                if key not in getattr(self, table):
+                    self._missing.add((table, key))
+            return getattr(self, table).get(key)
+
+    def scale(self, scale_id):
+        return self._get('_scales', scale_id)
+
+    def scales(self, question_id):
+        """
+        Scales of a MOS question, ordered by id.
+        """
+        return self._get('_questions', question_id) or []
+
+    def levels(self, scale_id):
+        """
+        Levels of a scale by id, in order of value.
+        """
+        return self._get('_levels', scale_id) or {}
+
+    def invalidate(self):
+        with self._lock:
+            self._scales = self._questions = self._levels = None
+            self._missing = set()
+
+
+scale_registry = ScaleRegistry()
@@ -0,0 +1,48 @@
+"""
+Batch resolution of Feed and Question rows into their concrete subclasses.
+"""
+from collections import defaultdict
+
+from django.db.models import QuerySet
+
+from .definition import *
+from .instantiation import *
+
+
+SPECIES = {
+    c.__name__: c
+    for c in [
+        AbQuestion, AbxQuestion, MushraQuestion, MosQuestion,
+        SectionFeed, AbFeed, AbxFeed, MushraFeed, MosFeed, EndFeed
+    ]
+}
+
+
+def resolve(objects):
+    """
+    Concrete instances for objects, in the same order.
+    objects is a queryset of pages (standing for their feeds), feeds or
+    questions, or a list of feeds or questions.
+    Each concrete table is read once, together with the relations named by
+    the select_related and prefetch_related attributes of its model.
+    """
+    if isinstance(objects, QuerySet):
+        if objects.model is Page:
+            rows = list(objects.values_list('feed__id', 'feed__species'))
+        else:
+            rows = list(objects.values_list('pk', 'species'))
+    else:
+        rows = [(o.pk, o.species) for o in objects]
+
+    ids = defaultdict(list)
+    for pk, species in rows:
+        ids[species].append(pk)
+
+    resolved = {}
+    for species, pks in ids.items():
+        c = SPECIES[species]
+        resolved[species] = c.objects\
+            .select_related(*c.select_related)\
+            .prefetch_related(*c.prefetch_related)\
+            .in_bulk(pks)
+    return [resolved[species][pk] for pk, species in rows]
@@ -1,5 +1,4 @@
-from django.db import models
-from django.db.models.signals import post_init
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
@@ -7,6 +6,13 @@ from django.utils.translation import gettext_lazy as _
 from .instantiation import *
 
 
+def invalid_choice():
+    return ValidationError(
+        _('Response value is not one of the provided options'),
+        code='corrupt'
+    )
+
+
 class Response(models.Model):
     class Meta:
         abstract = True
@@ -14,23 +20,74 @@ class Response(models.Model):
     # TODO Implement duration tracking
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField(null=True)
+    # Set by cook once the response holds a complete answer
+    answered = models.BooleanField(default=False)
+
+    @property
+    def is_complete(self):
+        return self.answered
 
     def clean(self):
-        for v in self.feed.question.restored_validators:
+        for v in self.feed.question.pipeline:
             v(self)
         super().clean()
 
+    def cached_bits(self):
+        """
+        Bits of the response, loaded once and kept in its prefetch cache so
+        that validators see the ones cook changed however the feed was
+        fetched.
+        """
+        cache = self.__dict__.setdefault('_prefetched_objects_cache', {})
+        if 'bits' not in cache:
+            bits = self.bits.all()
+            list(bits)
+            cache['bits'] = bits
+        return cache['bits']
+
     @staticmethod
     def cook(feed, ingredient):
         try:
-            {
+            response = {
                 AbFeed: AbResponse,
                 AbxFeed: AbxResponse,
                 MosFeed: MosResponse,
                 MushraFeed: MushraResponse
-            }[feed.__class__].cook(feed, ingredient)
+            }[feed.__class__]
         except KeyError:
-            pass
+            # Sections take no response
+            return
+
+        with transaction.atomic():
+            response.cook(feed, ingredient)
+            # The feed may have been loaded before a concurrent cook of the
+            # same response, so answered is flipped in the database and only
+            # a flip that took place is counted
+            answered = feed.response.answered
+            if response.objects.filter(
+                pk=feed.response.pk, answered=not answered
+            ).update(answered=answered):
+                Subject.tally(
+                    feed.page_id,
+                    feed.species,
+                    1 if answered else -1
+                )
+
+    @staticmethod
+    def cook_all(feeds, ingredients):
+        """
+        Cook the ingredient for each feed in turn, as cook would.
+        Returns the messages of responses that failed validation, malformed
+        ingredients included, by feed id; the other responses are saved
+        regardless.
+        """
+        errors = {}
+        for feed, ingredient in zip(feeds, ingredients):
+            try:
+                Response.cook(feed, ingredient)
+            except ValidationError as e:
+                errors[feed.id] = e.messages
+        return errors
 
 
 class AbResponse(Response):
@@ -46,16 +103,16 @@ class AbResponse(Response):
         null=True
     )
 
-    @property
-    def is_complete(self):
-        return self.value is not None
-
     @staticmethod
     def cook(feed, ingredient):
         if ingredient is not None:
-            feed.response.value = feed[ingredient]
+            try:
+                feed.response.value = dict(feed.choices())[ingredient]
+            except (KeyError, TypeError):
+                raise invalid_choice()
+        feed.response.answered = feed.response.value_id is not None
         feed.response.clean()
-        feed.response.save()
+        feed.response.save(update_fields=['value'])
 
 
 class AbxResponse(Response):
@@ -71,16 +128,16 @@ class AbxResponse(Response):
         null=True
     )
 
-    @property
-    def is_complete(self):
-        return self.value is not None
-
     @staticmethod
     def cook(feed, ingredient):
         if ingredient is not None:
-            feed.response.value = feed[ingredient]
+            try:
+                feed.response.value = dict(feed.choices())[ingredient]
+            except (KeyError, TypeError):
+                raise invalid_choice()
+        feed.response.answered = feed.response.value_id is not None
         feed.response.clean()
-        feed.response.save()
+        feed.response.save(update_fields=['value'])
 
 
 class MushraResponse(Response):
@@ -90,23 +147,31 @@ class MushraResponse(Response):
         related_name='response'
     )
 
-    @property
-    def is_complete(self):
-        # FIXME prolly wrong lol
-        try:
-            self.clean()
-            return True
-        except ValidationError:
-            return False
-
     @staticmethod
     def cook(feed, ingredient):
-        for k, v in ingredient.items():
-            bit = feed.response.bits.get(sample_id=int(k))
-            bit.value = int(v)
-            bit.clean()
-            bit.save()
-        response.clean()
+        if not isinstance(ingredient, (dict, type(None))):
+            raise invalid_choice()
+        bits = {bit.sample_id: bit for bit in feed.response.cached_bits()}
+        choices = dict(feed.choices())
+        changed = []
+        for k, v in (ingredient or {}).items():
+            try:
+                bit = bits[choices[int(k)].id]
+                bit.value = int(v)
+            except (KeyError, ValueError, TypeError):
+                raise invalid_choice()
+            bit.clean_fields(exclude=['whole', 'sample'])
+            changed.append(bit)
+
+        # Sliders have a value from the start, so a MUSHRA response counts as
+        # answered once all of them have been submitted
+        feed.response.answered = feed.response.answered or \
+            {bit.id for bit in changed} == {bit.id for bit in bits.values()}
+        # Validation sees the submitted values through cached_bits; they are
+        # written first all the same, and rolled back if invalid
+        with transaction.atomic():
+            MushraResponseBit.objects.bulk_update(changed, ['value'])
+            feed.response.clean()
 
 
 class MushraResponseBit(models.Model):
@@ -133,37 +198,28 @@ class MosResponse(Response):
         related_name='response'
     )
 
-    @property
-    def is_complete(self):
-        return all(
-            bit.is_complete
-            for bit in self.bits.all()
-        )
-
     @staticmethod
     def cook(feed, ingredient):
-        if ingredient is not None:
-            for k, v in ingredient.items():
-                bit = feed.response.bits.get(scale_id=int(k))
-                bit.value = MosLevel.objects.get(id=int(v))
-                bit.clean()
-                bit.save()
-        feed.response.clean()
-        feed.response.save()
-
-
-# Populate MosResponse with MosResponseBit obejcts
-def populate_mosresponse(**kwargs):
-    instance = kwargs.get('instance')
-    instance.save()
-    if not instance.bits.exists():
-        for scale in instance.feed.question.scales.order_by('id'):
-            MosResponseBit(
-                whole=instance,
-                scale=scale
-            ).save()
-    
-post_init.connect(populate_mosresponse, MosResponse)
+        levels = {
+            scale.id: scale_registry.levels(scale.id)
+            for scale in scale_registry.scales(feed.question_id)
+        }
+        if not isinstance(ingredient, (dict, type(None))):
+            raise invalid_choice()
+        bits = {bit.scale_id: bit for bit in feed.response.cached_bits()}
+        changed = []
+        for k, v in (ingredient or {}).items():
+            try:
+                bit = bits[int(k)]
+                bit.value = levels[bit.scale_id][int(v)]
+            except (KeyError, ValueError, TypeError):
+                raise invalid_choice()
+            changed.append(bit)
+
+        feed.response.answered = all(bit.is_complete for bit in bits.values())
+        with transaction.atomic():
+            MosResponseBit.objects.bulk_update(changed, ['value'])
+            feed.response.clean()
 
 
 class MosResponseBit(models.Model):
@@ -186,4 +242,4 @@ class MosResponseBit(models.Model):
 
     @property
     def is_complete(self):
-        return self.value is not None
\ No newline at end of file
+        return self.value_id is not None
\ No newline at end of file
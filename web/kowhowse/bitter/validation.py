@@ -1,7 +1,33 @@
+import json
+from functools import lru_cache
+
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
+# Response validators by name; Question.validators refers to these
+VALIDATORS = {}
+
+
+def validator(f):
+    """
+    Register f as a response validator under its name.
+    Validators should only look at the response and its feed as they were
+    loaded, so that validation doesn't query the database.
+    """
+    VALIDATORS[f.__name__] = f
+    return f
+
+
+@lru_cache(maxsize=None)
+def pipeline(names):
+    """
+    The validators named in names, a JSON list, in order.
+    """
+    return tuple(VALIDATORS[name] for name in json.loads(names or '[]'))
+
+
+@validator
 def validate_required(response):
     if not response.is_complete:
         raise ValidationError(
@@ -10,33 +36,44 @@ def validate_required(response):
         )
 
 
+@validator
 def validate_ab(response):
-    if not response.feed.samples.filter(id=response.value.id).exists():
+    if response.value_id is not None and \
+       response.value_id not in {s.id for s in response.feed.samples.all()}:
         raise ValidationError(
             _('Response value is not one of the provided samples'),
             code='corrupt'
         )
 
 
+@validator
 def validate_mos(response):
-    for bit in response.feed.bits.all():
-        if not bit.scale.levels.filter(id=bit.value.id).exists():
+    from .registry import scale_registry
+    levels = {
+        scale.id: scale_registry.levels(scale.id)
+        for scale in scale_registry.scales(response.feed.question_id)
+    }
+    for bit in response.bits.all():
+        if bit.value_id is not None and \
+           bit.value_id not in levels.get(bit.scale_id, ()):
             raise ValidationError(
                 _('Response value is not one of the provided options'),
                 code='corrupt'
             )
 
 
+@validator
 def validate_mushra_above_90(response):
-    if not response.bits.filter(value__gt=90).exists():
+    if not any(bit.value >= 90 for bit in response.bits.all()):
         raise ValidationError(
             _('At least one sample must be rated 90 or above'),
             code='custom'
         )
 
 
+@validator
 def validate_mushra_below_10(response):
-    if not response.bits.filter(value__lt=90).exists():
+    if not any(bit.value <= 10 for bit in response.bits.all()):
         raise ValidationError(
             _('At least one sample must be rated 10 or below'),
             code='custom'
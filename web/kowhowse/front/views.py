@@ -1,4 +1,6 @@
-from django.http import HttpResponse, HttpResponseRedirect
+import json
+
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic.base import TemplateView, RedirectView
 from django.views.generic.edit import FormView
@@ -42,10 +44,8 @@ class SurveyView(FormView):
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
-        subject = form.save(commit=False)
-        subject.survey = self.survey
-        subject.save()
-        question_allocator(subject.survey, subject)
+        subject = pool.claim(self.survey, form.instance.description)
+        instructions.warm(self.survey)
         self.request.session['subject'] = subject.id
         return HttpResponseRedirect(self.get_success_url())
 
@@ -67,7 +67,7 @@ class QuestionsView(TemplateView):
             Subject,
             pk=self.request.session.get('subject', None)
         )
-        self.feed = self.subject.current_feed.cast()
+        self.feed = self.subject.current_feed
 
     def get(self, request, *args, **kwargs):
         self.initialize(request, *args, **kwargs)
@@ -76,13 +76,7 @@ class QuestionsView(TemplateView):
     def post(self, request, *args, **kwargs):
         self.initialize(request, *args, **kwargs)
 
-        if isinstance(self.feed, MushraFeed):
-            ingredient = {
-                k.replace('response-', ''): v
-                for k, v in self.request.POST.items()
-                if k.startswith('response-')
-            }
-        elif isinstance(self.feed, MosFeed):
+        if isinstance(self.feed, (MushraFeed, MosFeed)):
             ingredient = {
                 k.replace('response-', ''): v
                 for k, v in self.request.POST.items()
@@ -96,18 +90,152 @@ class QuestionsView(TemplateView):
         except ValidationError as e:
             return self.render_to_response(self.get_context_data(**kwargs, error=e))
 
-        flip_direction = self.request.POST.get('page', '')
-        if flip_direction == 'next':
+        self.flip(self.request.POST.get('page', ''))
+        return redirect('front:questions', survey=kwargs['survey'])
+
+    def flip(self, direction):
+        if direction == 'next':
             self.subject.flip_next()
-        elif flip_direction == 'prev':
+        elif direction == 'prev':
             self.subject.flip_prev()
-        return redirect('front:questions', survey=kwargs['survey'])
 
     def get_context_data(self, **kwargs):
         if 'feed' not in kwargs:
             kwargs['feed'] = self.feed
+        # Samples of the next page, for the browser to fetch ahead of time
+        kwargs['upcoming'] = self.subject.samples_at(self.subject.cursor + 1)
         return super().get_context_data(**kwargs)
 
 
+class AnswerView(QuestionsView):
+    """
+    JSON counterpart of QuestionsView for pages rendered on the client.
+    GET returns the current feed; POST takes
+    {"response": <ingredient>, "page": "next" | "prev"}, cooks the response,
+    flips the page and returns the feed it lands on, all in one round trip.
+    upcoming lists the audio of the page after it, to be fetched ahead.
+    The ingredient is a choice for AB and ABX and an object mapping scales
+    or choices to values for MOS and MUSHRA, as given by the feed data.
+    """
+    url = rf'^(?P<survey>[\w\-]{{{Survey.UID_LENGTH}}})/answer/$'
+
+    @staticmethod
+    def create(): return never_cache(AnswerView.as_view())
+    name = 'answer'
+
+    def get(self, request, *args, **kwargs):
+        self.initialize(request, *args, **kwargs)
+        return self.render_to_json()
+
+    def post(self, request, *args, **kwargs):
+        self.initialize(request, *args, **kwargs)
+        try:
+            payload = json.loads(request.body.decode('utf-8') or '{}')
+            if not isinstance(payload, dict):
+                raise ValueError
+        except ValueError:
+            return JsonResponse({'error': ['Malformed JSON']}, status=400)
+
+        try:
+            Response.cook(self.feed, payload.get('response', None))
+        except ValidationError as e:
+            return self.render_to_json(error=e.messages, status=400)
+
+        self.flip(payload.get('page', ''))
+        self.feed = self.subject.current_feed
+        return self.render_to_json()
+
+    def render_to_json(self, status=200, **kwargs):
+        return JsonResponse(
+            dict(
+                feed=serialization.feed_to_dict(self.feed),
+                num_pages=self.subject.num_pages,
+                progress=self.subject.progress,
+                upcoming=[
+                    serialization.audio_to_dict(audio)
+                    for audio in self.subject.samples_at(
+                        self.subject.cursor + 1
+                    )
+                ],
+                **kwargs
+            ),
+            status=status
+        )
+
+
+class BundleView(AnswerView):
+    """
+    The whole session of a subject in one go, for listeners who answer
+    offline. GET returns every page of the subject in order; POST takes
+    {"responses": [{"feed": <id>, "response": <ingredient>}, ...],
+     "position": <int>} and cooks the responses in order with the same
+    validators as AnswerView, then moves the subject to position if given.
+    """
+    url = rf'^(?P<survey>[\w\-]{{{Survey.UID_LENGTH}}})/bundle/$'
+
+    @staticmethod
+    def create(): return never_cache(BundleView.as_view())
+    name = 'bundle'
+
+    def initialize(self, request, *args, **kwargs):
+        self.subject = get_object_or_404(
+            Subject.objects.select_related('survey'),
+            pk=self.request.session.get('subject', None)
+        )
+
+    def get(self, request, *args, **kwargs):
+        self.initialize(request, *args, **kwargs)
+        materialize_all(self.subject)
+        return JsonResponse({
+            'instruction': serialization.instruction_to_dict(
+                self.subject.survey
+            ),
+            'position': self.subject.cursor,
+            'num_pages': self.subject.num_pages,
+            'feeds': [
+                serialization.feed_to_dict(feed)
+                for feed in resolve(self.subject.pages.order_by('position'))
+            ]
+        })
+
+    def post(self, request, *args, **kwargs):
+        self.initialize(request, *args, **kwargs)
+        try:
+            payload = json.loads(request.body.decode('utf-8') or '{}')
+            entries = [
+                (int(entry['feed']), entry.get('response', None))
+                for entry in payload.get('responses', [])
+            ]
+            position = payload.get('position', None)
+            if position is not None:
+                position = int(position)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return JsonResponse({'error': ['Malformed JSON']}, status=400)
+
+        feeds = {
+            feed.id: feed
+            for feed in resolve(
+                self.subject.pages.filter(feed__id__in=[
+                    id for id, _ in entries
+                ])
+            )
+        }
+        errors = {
+            id: ['Unknown feed'] for id, _ in entries if id not in feeds
+        }
+        entries = [(feeds[id], i) for id, i in entries if id in feeds]
+        errors.update(Response.cook_all(
+            [feed for feed, _ in entries],
+            [ingredient for _, ingredient in entries]
+        ))
+
+        if position is not None:
+            self.subject.flip_to(position)
+        return JsonResponse(
+            {'errors': errors, 'position': self.subject.cursor},
+            status=400 if errors else 200
+        )
+
+
 site = FrontSite()
-site.register(SurveyView, QuestionsView)
+site.register(SurveyView, QuestionsView, AnswerView, BundleView)
@@ -1,4 +1,5 @@
 from .allocation import *
+from . import encoding, pool, serialization
 
 
 question_allocator = allocate
@@ -1,57 +1,167 @@
+import json
 import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
 from ..bitter import *
 from .pagination import Paginator
 
 
-def allocate(survey, subject):
-    with Paginator(survey, subject):
-        for section in survey.sections.all():
-            section.feeds.create().save()
+@transaction.atomic
+def allocate(survey, subject, lazy=None):
+    """
+    Lay out the pages of subject.
+    A lazy allocation only fixes the order, seeds and samples of the pages in
+    subject.plan; their rows are created by materialize as the subject gets to
+    them.
+    """
+    if lazy is None:
+        lazy = getattr(settings, 'LAZY_ALLOCATION', False)
+
+    feeds = list(create_feeds(survey))
+    subject.num_pages = len(feeds)
+    subject.num_questions = sum(
+        not isinstance(feed, SectionFeed) for feed, _ in feeds
+    )
+    subject.completed = subject.num_answered >= subject.num_questions
+    if lazy:
+        subject.plan = json.dumps([
+            plan(feed, samples) for feed, samples in feeds
+        ])
+    else:
+        with Paginator(survey, subject) as paginator:
+            for feed, samples in feeds:
+                paginator.add(feed, samples)
+    subject.save()
+
+
+def materialize(subject, position):
+    """
+    Create the planned page at position for a lazily allocated subject.
+    Returns None if subject isn't lazily allocated or position is out of range.
+    """
+    if subject.plan is None or \
+       not 0 <= position < len(subject.planned_pages):
+        return None
+
+    try:
+        with Paginator(subject.survey, subject, position) as paginator:
+            paginator.add(*unplan(subject.planned_pages[position]))
+    except IntegrityError:
+        # A concurrent request created the page first
+        return subject.pages.get(position=position)
+    return paginator.pages[0]
+
+
+@transaction.atomic
+def materialize_all(subject):
+    """
+    Create all planned pages of a lazily allocated subject that don't exist
+    yet, a run of consecutive pages at a time.
+    """
+    if subject.plan is None:
+        return
+    existing = set(subject.pages.values_list('position', flat=True))
+    runs = []
+    for position in range(len(subject.planned_pages)):
+        if position in existing:
+            continue
+        if runs and runs[-1][-1] == position - 1:
+            runs[-1].append(position)
+        else:
+            runs.append([position])
+
+    for run in runs:
+        try:
+            with Paginator(subject.survey, subject, run[0]) as paginator:
+                for position in run:
+                    paginator.add(*unplan(subject.planned_pages[position]))
+        except IntegrityError:
+            # A concurrent request created some of these pages; fill in the
+            # rest one at a time
+            for position in run:
+                if not subject.pages.filter(position=position).exists():
+                    materialize(subject, position)
 
-            for question in section.questions.all():
-                {
-                    'AbQuestion': create_abfeed,
-                    'AbxQuestion': create_abxfeed,
-                    'MosQuestion': create_mosfeed,
-                    'MushraQuestion': create_mushrafeed
-                }[question.species](question.cast())
+
+def plan(feed, samples):
+    species = feed.__class__.__name__
+    if isinstance(feed, SectionFeed):
+        return [species, feed.section_id, None, []]
+    if isinstance(feed, MosFeed):
+        return [species, feed.question_id, feed.seed, [feed.sample_id]]
+    return [species, feed.question_id, feed.seed,
+            [sample.id for sample in samples]]
+
+
+def unplan(entry):
+    species, id, seed, samples = entry
+    if species == 'SectionFeed':
+        return SectionFeed(section_id=id), []
+    if species == 'MosFeed':
+        return MosFeed(question_id=id, seed=seed, sample_id=samples[0]), []
+    return (
+        {
+            'AbFeed': AbFeed,
+            'AbxFeed': AbxFeed,
+            'MushraFeed': MushraFeed
+        }[species](question_id=id, seed=seed),
+        [Audio(id=sample) for sample in samples]
+    )
+
+
+def create_feeds(survey):
+    questions = defaultdict(list)
+    for question in survey.question_index():
+        questions[question.section_id].append(question)
+
+    for section in survey.sections.order_by('id'):
+        yield SectionFeed(section=section), []
+
+        for question in questions[section.id]:
+            yield {
+                'AbQuestion': create_abfeed,
+                'AbxQuestion': create_abxfeed,
+                'MosQuestion': create_mosfeed,
+                'MushraQuestion': create_mushrafeed
+            }[question.species](question)
 
 
 def create_abfeed(question):
-    feed = AbFeed(question=question)
-    feed.save()
-    feed.samples.add(*random.sample(list(question.samples.all()), 2))
-    feed.save()
+    feed = AbFeed(question=question, seed=random_seed())
+    return feed, random.sample(list(question.samples.all()), 2)
 
 
 def create_abxfeed(question):
-    feed = AbxFeed(question=question)
-    feed.save()
-    feed.samples.add(*random.sample(list(question.samples.all()), 2))
-    feed.save()
+    feed = AbxFeed(question=question, seed=random_seed())
+    return feed, random.sample(list(question.samples.all()), 2)
 
 
 def create_mosfeed(question):
-    feed = MosFeed(question=question)
-    feed.sample = random.choice(list(question.samples.all()))
-    feed.save()
+    sample = random.choice(list(question.samples.all()))
+    feed = MosFeed(question=question, sample=sample, seed=random_seed())
+    return feed, []
 
 
 def create_mushrafeed(question):
-    feed = MushraFeed(question=question)
-    feed.save()
-    feed.samples.add(random.choice(question.references))
-    feed.samples.add(
-        *random.sample(
-            list(question.anchors),
-            question.num_anchors or question.anchors.count()
+    feed = MushraFeed(question=question, seed=random_seed())
+    roles = defaultdict(list)
+    for sample in question.samples.all():
+        roles[sample.role].append(sample)
+
+    samples = [random.choice(roles[Audio.REFERENCE])]
+    samples.extend(
+        random.sample(
+            roles[Audio.ANCHOR],
+            question.num_anchors or len(roles[Audio.ANCHOR])
         )
     )
-    feed.samples.add(
-        *random.sample(
-            list(question.stimuli),
-            question.num_stimuli or question.stimuli.count()
+    samples.extend(
+        random.sample(
+            roles[Audio.STIMULUS],
+            question.num_stimuli or len(roles[Audio.STIMULUS])
         )
     )
-    feed.save()
+    return feed, samples
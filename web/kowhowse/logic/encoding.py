@@ -0,0 +1,89 @@
+"""
+Compressed variants of audio files, served ahead of the originals.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from ..bitter import *
+
+
+# Variant format -> (extension, MIME type, encoder command lines to try)
+ENCODINGS = {
+    'flac': ('flac', 'audio/flac', [
+        ['ffmpeg', '-y', '-v', 'error', '-i', '{src}', '-c:a', 'flac', '{dst}'],
+        ['flac', '--silent', '--force', '--best', '-o', '{dst}', '{src}'],
+    ]),
+    'opus': ('opus', 'audio/ogg; codecs=opus', [
+        ['ffmpeg', '-y', '-v', 'error', '-i', '{src}', '-c:a', 'libopus',
+         '-b:a', '96k', '{dst}'],
+        ['opusenc', '--quiet', '--bitrate', '96', '{src}', '{dst}'],
+    ]),
+}
+
+
+def formats():
+    """
+    Variant formats to produce; FLAC is lossless, Opus is not.
+    """
+    return getattr(settings, 'AUDIO_ENCODINGS', ['flac'])
+
+
+def encoder(fmt):
+    """
+    The first command line for fmt whose program is installed, or None.
+    """
+    for command in ENCODINGS[fmt][2]:
+        if shutil.which(command[0]) is not None:
+            return command
+    return None
+
+
+def encode(audio, fmts=None, force=False):
+    """
+    Encode audio into each of fmts that has an installed encoder and record
+    the variants on audio. Variants that aren't smaller than the original
+    are dropped. Returns the formats that were encoded.
+    """
+    variants = {fmt: v for fmt, *v in audio.variant_list()}
+    encoded = []
+    for fmt in fmts or formats():
+        if fmt in variants and not force:
+            continue
+        command = encoder(fmt)
+        if command is None:
+            continue
+        ext, mime_type, _ = ENCODINGS[fmt]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dst = os.path.join(tmp, 'variant.' + ext)
+            try:
+                subprocess.run(
+                    [arg.format(src=audio.data.path, dst=dst)
+                     for arg in command],
+                    check=True, capture_output=True, timeout=600
+                )
+            except (OSError, subprocess.SubprocessError):
+                continue
+            size = os.path.getsize(dst)
+            if audio.size is not None and size >= audio.size:
+                continue
+            if fmt in variants:
+                default_storage.delete(variants[fmt][0])
+            with open(dst, 'rb') as f:
+                name = default_storage.save(
+                    os.path.splitext(audio.data.name)[0] + '.' + ext,
+                    File(f)
+                )
+        variants[fmt] = [name, mime_type, size]
+        encoded.append(fmt)
+
+    if encoded:
+        audio.set_variant_list([[fmt, *v] for fmt, v in variants.items()])
+        audio.save(update_fields=['variants'])
+    return encoded
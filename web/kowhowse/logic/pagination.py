@@ -1,41 +1,172 @@
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+
 from ..bitter import *
 
 
 class Paginator:
-    feed_classes = [SectionFeed, EndFeed, AbFeed, AbxFeed, MushraFeed, MosFeed]
+    """
+    Lays feeds out on a subject's pages, numbering pages from position.
+    Feeds are collected in memory and written on exit with a handful of bulk
+    queries inside one transaction, instead of one save per row.
+    """
+    responses = {
+        AbFeed: AbResponse,
+        AbxFeed: AbxResponse,
+        MushraFeed: MushraResponse,
+        MosFeed: MosResponse
+    }
 
-    def __init__(self, survey, subject):
+    def __init__(self, survey, subject, position=0):
         self._survey = survey
         self._subject = subject
-        self._current = None
+        self._position = position
+        self._feeds = []
+        self.pages = []
 
     def __enter__(self):
-        def create_page(sender, instance, *args, **kwargs):
-            if instance.page is None:
-                page = Page(survey=self._survey, subject=self._subject)
-                page.save()
-                if self._current is not None:
-                    self._current.next_page = page
-                    self._current.save()
-                    page.prev_page = self._current
-                    page.save()
-                else:
-                    page.is_current = True
-                    page.save()
-                self._current = page
-                instance.page = page
-
-        for c in Paginator.feed_classes:
-            signals.pre_save.connect(
-                create_page,
-                sender=c,
-                weak=False,
-                dispatch_uid='create_page_{}'.format(c.__name__)
-            )
+        return self
 
     def __exit__(self, exc_type, exc_value, exc_tb):
-        for c in Paginator.feed_classes:
-            signals.pre_save.disconnect(
-                sender=c,
-                dispatch_uid='create_page_{}'.format(c.__name__)
+        if exc_type is None:
+            self.flush()
+
+    def add(self, feed, samples=()):
+        if isinstance(feed, PreferenceFeed):
+            feed.map(samples)
+        self._feeds.append((feed, list(samples)))
+
+    @transaction.atomic
+    def flush(self):
+        if not self._feeds:
+            return
+        pages = self._create_pages()
+        feeds = self._create_feeds(pages)
+        self._create_responses(feeds)
+        self.pages.extend(pages)
+        self._feeds = []
+
+    def _create_pages(self):
+        pages = Page.objects.bulk_create([
+            Page(
+                survey=self._survey,
+                subject=self._subject,
+                position=self._position + k
+            )
+            for k in range(len(self._feeds))
+        ])
+        # SQLite doesn't hand back primary keys from bulk inserts
+        ids = dict(
+            self._subject.pages
+            .filter(position__range=(pages[0].position, pages[-1].position))
+            .values_list('position', 'id')
+        )
+        for page in pages:
+            page.id = ids[page.position]
+        self._position += len(pages)
+        return pages
+
+    def _create_feeds(self, pages):
+        Feed.objects.bulk_create([
+            Feed(species=feed.species, page=page)
+            for (feed, _), page in zip(self._feeds, pages)
+        ])
+        ids = dict(
+            Feed.objects
+            .filter(
+                page__subject=self._subject,
+                page__position__range=(pages[0].position, pages[-1].position)
             )
+            .values_list('page_id', 'id')
+        )
+
+        children = defaultdict(list)
+        through = defaultdict(list)
+        for (feed, samples), page in zip(self._feeds, pages):
+            feed.id = feed.feed_ptr_id = ids[page.id]
+            feed.page = page
+            children[feed.__class__].append(feed)
+            for sample in samples:
+                through[feed.__class__].append(
+                    feed.__class__.samples.through(
+                        **{
+                            feed.__class__.samples.field.m2m_field_name():
+                                feed,
+                            feed.__class__.samples.field.m2m_reverse_field_name():
+                                sample
+                        }
+                    )
+                )
+
+        for c, objs in children.items():
+            bulk_create_children(c, objs)
+        for c, objs in through.items():
+            c.samples.through.objects.bulk_create(objs)
+        return [feed for feed, _ in self._feeds]
+
+    def _create_responses(self, feeds):
+        responses = defaultdict(list)
+        for feed in feeds:
+            if feed.__class__ in Paginator.responses:
+                responses[Paginator.responses[feed.__class__]].append(
+                    Paginator.responses[feed.__class__](feed=feed)
+                )
+        for c, objs in responses.items():
+            c.objects.bulk_create(objs)
+
+        mos_responses = responses[MosResponse]
+        if mos_responses:
+            self._read_ids(MosResponse, mos_responses)
+            bits = []
+            for response in mos_responses:
+                scales = scale_registry.scales(response.feed.question_id)
+                bits.extend(
+                    MosResponseBit(whole=response, scale=scale)
+                    for scale in scales
+                )
+            MosResponseBit.objects.bulk_create(bits)
+
+        mushra_responses = responses[MushraResponse]
+        if mushra_responses:
+            self._read_ids(MushraResponse, mushra_responses)
+            samples = {id(feed): samples for feed, samples in self._feeds}
+            MushraResponseBit.objects.bulk_create([
+                MushraResponseBit(whole=response, sample=sample)
+                for response in mushra_responses
+                for sample in samples[id(response.feed)]
+            ])
+
+    def _read_ids(self, c, responses):
+        # SQLite doesn't hand back primary keys from bulk inserts
+        ids = dict(
+            c.objects
+            .filter(
+                feed__page__subject=self._subject,
+                feed__page__position__range=(
+                    responses[0].feed.page.position,
+                    responses[-1].feed.page.position
+                )
+            )
+            .values_list('feed_id', 'id')
+        )
+        for response in responses:
+            response.id = ids[response.feed.id]
+
+
+def bulk_create_children(model, objs):
+    """
+    bulk_create for multi-table inherited models, which Django refuses to do.
+    The parent rows must already exist and objs must carry their primary keys;
+    only the child table is written.
+    """
+    using = router.db_for_write(model)
+    fields = model._meta.local_concrete_fields
+    batch_size = connections[using].ops.bulk_batch_size(fields, objs) or \
+                 len(objs)
+    for k in range(0, len(objs), batch_size):
+        model._base_manager._insert(
+            objs[k:k + batch_size],
+            fields=fields,
+            using=using
+        )
@@ -0,0 +1,94 @@
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from ..bitter import *
+from .allocation import allocate
+
+
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def pool_size():
+    return getattr(settings, 'SUBJECT_POOL_SIZE', 0)
+
+
+def preallocate(survey, count):
+    """
+    Create count subjects for survey that are allocated and ready to be claimed.
+    """
+    for _ in range(count):
+        with transaction.atomic():
+            subject = Subject(survey=survey, description='', pooled=True)
+            subject.save()
+            allocate(survey, subject)
+
+
+def refill(survey):
+    """
+    Top up the pool of survey to SUBJECT_POOL_SIZE subjects.
+    """
+    preallocate(
+        survey,
+        max(0, pool_size() - survey.subjects.filter(pooled=True).count())
+    )
+
+
+def refill_in_background(survey):
+    """
+    Refill the pool of survey on a worker thread once the current transaction
+    commits, if SUBJECT_POOL_REFILL_ON_CLAIM is set. At most one refill runs
+    per survey at a time in this process.
+    """
+    def run():
+        try:
+            refill(survey)
+        finally:
+            with _refilling_lock:
+                _refilling.discard(survey.uid)
+            connection.close()
+
+    def start():
+        with _refilling_lock:
+            if survey.uid in _refilling:
+                return
+            _refilling.add(survey.uid)
+        threading.Thread(target=run, daemon=True).start()
+
+    if pool_size() > 0 and \
+       getattr(settings, 'SUBJECT_POOL_REFILL_ON_CLAIM', False):
+        transaction.on_commit(start)
+
+
+def claim(survey, description):
+    """
+    Hand a pooled subject over to a listener, falling back to allocating a
+    new subject on the spot when the pool is empty.
+    """
+    subject = None
+    while subject is None:
+        candidate = survey.subjects.filter(pooled=True).order_by('id').first()
+        if candidate is None:
+            break
+        # Someone else may have claimed the same subject in the meantime
+        if Subject.objects.filter(pk=candidate.pk, pooled=True)\
+                          .update(pooled=False, description=description):
+            subject = candidate
+            subject.pooled = False
+            subject.description = description
+
+    if subject is None:
+        with transaction.atomic():
+            subject = Subject(survey=survey, description=description)
+            subject.save()
+            allocate(survey, subject)
+
+    SurveyStats.count(
+        survey,
+        num_subjects=1,
+        num_complete=int(subject.completed)
+    )
+    refill_in_background(survey)
+    return subject
@@ -0,0 +1,87 @@
+from ..bitter import *
+
+
+def audio_to_dict(audio):
+    return {
+        'id': audio.id,
+        'url': audio.data.url,
+        'type': audio.data_format(),
+        'sources': [
+            {'url': audio.data.storage.url(source.name), 'type': source.type}
+            for source in audio.sources()
+        ],
+        'duration': audio.duration,
+        'sample_rate': audio.sample_rate,
+        'channels': audio.channels,
+        'size': audio.size,
+        'checksum': audio.checksum
+    }
+
+
+def instruction_to_dict(instructable):
+    if not instructable.instruction:
+        return None
+    return instructable.instruction_html
+
+
+def feed_to_dict(feed):
+    """
+    What the questions page shows for feed, for clients that render pages
+    themselves. Values under response are what QuestionsView.post expects
+    back for the feed.
+    """
+    d = {
+        'id': feed.id,
+        'species': feed.species,
+        'position': feed.page.position
+    }
+
+    if isinstance(feed, SectionFeed):
+        d['instruction'] = instruction_to_dict(feed.section)
+        return d
+
+    d['instruction'] = instruction_to_dict(feed.question)
+    if isinstance(feed, (AbFeed, AbxFeed)):
+        d['choices'] = [
+            {'value': k, 'audio': audio_to_dict(v)}
+            for k, v in feed.choices()
+        ]
+        if isinstance(feed, AbxFeed):
+            d['reference'] = audio_to_dict(feed['X'])
+        d['response'] = next(
+            (k for k, v in feed.choices() if v.id == feed.response.value_id),
+            None
+        )
+    elif isinstance(feed, MosFeed):
+        d['sample'] = audio_to_dict(feed.sample)
+        d['scales'] = [
+            {
+                'value': scale.id,
+                'description': scale.description,
+                'levels': [
+                    {'value': level.id, 'description': level.description}
+                    for level in scale.choices()
+                ]
+            }
+            for scale in scale_registry.scales(feed.question_id)
+        ]
+        d['response'] = {
+            bit.scale_id: bit.value_id
+            for bit in feed.response.bits.all()
+        }
+    elif isinstance(feed, MushraFeed):
+        d['reference'] = audio_to_dict(feed.reference)
+        d['choices'] = [
+            {'value': k, 'audio': audio_to_dict(v)}
+            for k, v in feed.choices()
+        ]
+        values = {
+            bit.sample_id: bit.value
+            for bit in feed.response.bits.all()
+        }
+        d['response'] = {
+            k: values[v.id]
+            for k, v in feed.choices()
+            if v.id in values
+        }
+    return d
@@ -6,9 +6,11 @@ from argparse import FileType
 
 from django.core.management.base import BaseCommand, CommandError
 from django.core.files import File
+from django.core.files.storage import default_storage
 from django.conf import settings
 
 from kowhowse import bitter as B, sweet as S
+from kowhowse.logic import encoding
 
 
 class Command(BaseCommand):
@@ -36,6 +38,50 @@ class Command(BaseCommand):
         survey.save()
         return _survey, survey
 
+    def store_audio(self, path, checksum):
+        """
+        Name of the file at path in storage, where audio is kept by content.
+        Files already in storage aren't stored again; others are copied, so
+        that later edits to the source don't change a survey's stimuli.
+        """
+        name = f'audio/{checksum[:2]}/{checksum}{Path(path).suffix}'
+        if default_storage.exists(name):
+            return name
+        with open(path, 'rb') as f:
+            return default_storage.save(name, File(f))
+
+    def create_audio(self, _sample, system):
+        """
+        Audio for _sample; reuses an existing Audio with the same content,
+        description, system and role, e.g. from an earlier import.
+        """
+        meta = B.probe_audio(_sample.data)
+        sample = B.Audio.objects.filter(
+            checksum=meta['checksum'],
+            description=_sample.description,
+            system=system,
+            role=_sample.role
+        ).first()
+        if sample is not None:
+            return sample
+
+        sample = B.Audio(
+            description=_sample.description,
+            system=system,
+            role=_sample.role,
+            **meta
+        )
+        sample.data.name = self.store_audio(_sample.data, meta['checksum'])
+        # Variants are named after the file, so they're shared as well
+        encoded = B.Audio.objects.filter(checksum=meta['checksum'])\
+                                 .exclude(variants='[]').first()
+        if encoded is not None:
+            sample.variants = encoded.variants
+        sample.save()
+        if encoded is None:
+            encoding.encode(sample)
+        return sample
+
     def handle(self, *args, **kwargs):
         _survey, survey = self.create_survey(kwargs['script'])
 
@@ -123,24 +169,20 @@ class Command(BaseCommand):
                 for _sample in _question:
                     system = systems.get(_sample.system, None)
                     if system is None:
-                        systems[_sample.system] = B.System(description=_sample.system.description)
-                        system = systems[_sample.system]
-                        system.save()
+                        system = B.System.objects.filter(
+                            description=_sample.system.description
+                        ).first()
+                        if system is None:
+                            system = B.System(
+                                description=_sample.system.description
+                            )
+                            system.save()
+                        systems[_sample.system] = system
 
                     sample = samples.get(_sample, None)
                     if sample is None:
-                        samples[_sample] = B.Audio(
-                            description=_sample.description,
-                            system=system,
-                            role=_sample.role
-                        )
-                        sample = samples[_sample]
-                        with open(_sample.data, 'rb') as f:
-                            sample.data.save(
-                                Path(system.description)/Path(_sample.data).name,
-                                File(f)
-                            )
-                        sample.save()
+                        sample = samples[_sample] = \
+                            self.create_audio(_sample, system)
                     question.samples.add(sample)
                 question.save()
             section.save()
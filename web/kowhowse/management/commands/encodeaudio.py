@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kowhowse import bitter as B
+from kowhowse.logic import encoding
+
+
+class Command(BaseCommand):
+    help = 'Encode compressed variants of audio for serving'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formats', nargs='+', default=None,
+                            choices=sorted(encoding.ENCODINGS),
+                            help='Formats to encode; AUDIO_ENCODINGS if omitted')
+        parser.add_argument('--force', action='store_true',
+                            help='Encode again variants that already exist')
+
+    def handle(self, *args, **kwargs):
+        fmts = kwargs['formats'] or encoding.formats()
+        missing = [fmt for fmt in fmts if encoding.encoder(fmt) is None]
+        if missing:
+            raise CommandError(f"No encoder installed for {', '.join(missing)}")
+
+        count = 0
+        for audio in B.Audio.objects.all():
+            if encoding.encode(audio, fmts, force=kwargs['force']):
+                count += 1
+        self.stdout.write(f'{count} audio files encoded')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kowhowse import bitter as B
+from kowhowse.logic import pool
+
+
+class Command(BaseCommand):
+    help = 'Allocate subjects ahead of time so listeners can start at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('uid')
+        parser.add_argument('--count', type=int, default=None,
+                            help='Number of subjects to add to the pool; '
+                                 'tops up to SUBJECT_POOL_SIZE if omitted')
+
+    def handle(self, *args, **kwargs):
+        try:
+            survey = B.Survey.objects.get(uid=kwargs['uid'])
+        except B.Survey.DoesNotExist:
+            raise CommandError(f"Survey {kwargs['uid']} does not exist")
+
+        if kwargs['count'] is None:
+            pool.refill(survey)
+        else:
+            pool.preallocate(survey, kwargs['count'])
+
+        self.stdout.write(
+            f'{survey.subjects.filter(pooled=True).count()} '
+            f'subjects pooled for {survey.uid}'
+        )
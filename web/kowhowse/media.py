@@ -0,0 +1,127 @@
+"""
+Serving of uploaded media, mostly audio, without a separate web server.
+"""
+import os
+import re
+import stat
+import mimetypes
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+mimetypes.add_type('audio/flac', '.flac')
+mimetypes.add_type('audio/ogg', '.opus')
+mimetypes.add_type('audio/wav', '.wav')
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """
+    At most length bytes of f from its current position.
+    Used for ranges that stop short of the end of the file; ranges to the
+    end are served from f itself, so that WSGI servers can sendfile them.
+    """
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def max_age():
+    return getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 30)
+
+
+def byte_range(request, size, etag, last_modified):
+    """
+    The (first, last) bytes requested by request's Range header, None for
+    the whole file or False if the range can't be satisfied.
+    Multiple ranges aren't supported and get the whole file.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag and \
+       parse_http_date_safe(if_range) != last_modified:
+        return None
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first:
+        first = int(first)
+        last = min(int(last), size - 1) if last else size - 1
+    elif last:
+        # Suffix range: the last so many bytes
+        first, last = max(0, size - int(last)), size - 1
+    else:
+        return None
+    if first > last or first >= size:
+        return False
+    return first, last
+
+
+def serve(request, path):
+    """
+    Serve the file at path under MEDIA_ROOT with support for conditional and
+    byte range requests.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('File does not exist')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('File does not exist')
+
+    size = st.st_size
+    last_modified = int(st.st_mtime)
+    etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        bounds = byte_range(request, size, etag, last_modified)
+        if bounds is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        else:
+            content_type = mimetypes.guess_type(fullpath)[0] or \
+                'application/octet-stream'
+            f = open(fullpath, 'rb')
+            if bounds is None:
+                response = FileResponse(f, content_type=content_type)
+                response['Content-Length'] = size
+            else:
+                first, last = bounds
+                f.seek(first)
+                if last < size - 1:
+                    f = RangeFile(f, last - first + 1)
+                response = FileResponse(
+                    f, status=206, content_type=content_type
+                )
+                response['Content-Length'] = last - first + 1
+                response['Content-Range'] = f'bytes {first}-{last}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'public, max-age={max_age()}'
+    return response
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='plan',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='pooled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Replaces the doubly linked chain of pages with page positions and a cursor
+# on the subject
+
+from django.db import migrations, models
+
+
+def number_pages(apps, schema_editor):
+    Subject = apps.get_model('kowhowse', 'Subject')
+    Page = apps.get_model('kowhowse', 'Page')
+    db = schema_editor.connection.alias
+
+    for subject in Subject.objects.using(db).all():
+        pages = {
+            page.id: page
+            for page in Page.objects.using(db).filter(subject=subject)
+        }
+        chain = []
+        page = next(
+            (p for p in pages.values() if p.prev_page_id is None),
+            None
+        )
+        while page is not None and page not in chain:
+            chain.append(page)
+            page = pages.get(page.next_page_id)
+        # Pages that fell off the chain go to the end
+        chain.extend(sorted(
+            (p for p in pages.values() if p not in chain),
+            key=lambda p: p.id
+        ))
+
+        for position, page in enumerate(chain):
+            page.position = position
+            if page.is_current:
+                subject.cursor = position
+        Page.objects.using(db).bulk_update(chain, ['position'])
+        subject.num_pages = len(chain)
+        subject.save()
+
+
+def link_pages(apps, schema_editor):
+    Subject = apps.get_model('kowhowse', 'Subject')
+    Page = apps.get_model('kowhowse', 'Page')
+    db = schema_editor.connection.alias
+
+    for subject in Subject.objects.using(db).all():
+        chain = list(
+            Page.objects.using(db).filter(subject=subject).order_by('position')
+        )
+        for prev_page, next_page in zip(chain, chain[1:]):
+            prev_page.next_page = next_page
+            next_page.prev_page = prev_page
+        for page in chain:
+            page.is_current = page.position == subject.cursor
+        Page.objects.using(db).bulk_update(
+            chain, ['prev_page', 'next_page', 'is_current']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0002_subject_pool_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='cursor',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='num_pages',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='position',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(number_pages, link_pages),
+        migrations.RemoveField(
+            model_name='page',
+            name='is_current',
+        ),
+        migrations.RemoveField(
+            model_name='page',
+            name='next_page',
+        ),
+        migrations.RemoveField(
+            model_name='page',
+            name='prev_page',
+        ),
+        migrations.AlterField(
+            model_name='page',
+            name='position',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='page',
+            unique_together={('subject', 'position')},
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:12
+
+import json
+
+from django.db import migrations, models
+
+
+def tally_subjects(apps, schema_editor):
+    Subject = apps.get_model('kowhowse', 'Subject')
+    Page = apps.get_model('kowhowse', 'Page')
+    db = schema_editor.connection.alias
+
+    answered = [
+        apps.get_model('kowhowse', 'AbResponse').objects.using(db)
+        .filter(value__isnull=False),
+        apps.get_model('kowhowse', 'AbxResponse').objects.using(db)
+        .filter(value__isnull=False),
+        apps.get_model('kowhowse', 'MosResponse').objects.using(db)
+        .filter(bits__isnull=False)
+        .exclude(bits__value__isnull=True)
+        .distinct(),
+    ]
+
+    for subject in Subject.objects.using(db).all():
+        if subject.plan is not None:
+            subject.num_questions = sum(
+                species != 'SectionFeed'
+                for species, *_ in json.loads(subject.plan)
+            )
+        else:
+            subject.num_questions = Page.objects.using(db)\
+                .filter(subject=subject)\
+                .exclude(feed__species__in=['SectionFeed', 'EndFeed'])\
+                .count()
+        subject.num_answered = sum(
+            responses.filter(feed__page__subject=subject).count()
+            for responses in answered
+        )
+        subject.completed = subject.num_answered >= subject.num_questions
+        subject.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0003_page_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='completed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='num_answered',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='num_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(tally_subjects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_surveys(apps, schema_editor):
+    Survey = apps.get_model('kowhowse', 'Survey')
+    SurveyStats = apps.get_model('kowhowse', 'SurveyStats')
+    db = schema_editor.connection.alias
+
+    answered = {
+        'num_ab_responses':
+            apps.get_model('kowhowse', 'AbResponse').objects.using(db)
+            .filter(value__isnull=False),
+        'num_abx_responses':
+            apps.get_model('kowhowse', 'AbxResponse').objects.using(db)
+            .filter(value__isnull=False),
+        'num_mos_responses':
+            apps.get_model('kowhowse', 'MosResponse').objects.using(db)
+            .filter(bits__isnull=False)
+            .exclude(bits__value__isnull=True)
+            .distinct(),
+    }
+
+    for survey in Survey.objects.using(db).all():
+        participants = survey.subjects.filter(pooled=False)
+        SurveyStats.objects.using(db).create(
+            survey=survey,
+            num_subjects=participants.count(),
+            num_complete=participants.filter(completed=True).count(),
+            **{
+                field: responses.filter(
+                    feed__page__subject__in=participants
+                ).count()
+                for field, responses in answered.items()
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0004_subject_completion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyStats',
+            fields=[
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='kowhowse.Survey')),
+                ('num_subjects', models.PositiveIntegerField(default=0)),
+                ('num_complete', models.PositiveIntegerField(default=0)),
+                ('num_ab_responses', models.PositiveIntegerField(default=0)),
+                ('num_abx_responses', models.PositiveIntegerField(default=0)),
+                ('num_mos_responses', models.PositiveIntegerField(default=0)),
+                ('num_mushra_responses', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_surveys, migrations.RunPython.noop),
+    ]
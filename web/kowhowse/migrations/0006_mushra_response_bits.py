@@ -0,0 +1,30 @@
+# MUSHRA responses get one bit per sample of their feed when they are
+# allocated; this creates the bits of responses allocated before that
+
+from django.db import migrations
+
+
+def populate_mushraresponses(apps, schema_editor):
+    MushraResponse = apps.get_model('kowhowse', 'MushraResponse')
+    MushraResponseBit = apps.get_model('kowhowse', 'MushraResponseBit')
+    db = schema_editor.connection.alias
+
+    MushraResponseBit.objects.using(db).bulk_create([
+        MushraResponseBit(whole=response, sample=sample)
+        for response in MushraResponse.objects.using(db)
+                        .filter(bits__isnull=True)
+                        .select_related('feed')
+                        .prefetch_related('feed__samples')
+        for sample in response.feed.samples.all()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0005_surveystats'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_mushraresponses, migrations.RunPython.noop),
+    ]
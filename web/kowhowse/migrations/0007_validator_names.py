@@ -0,0 +1,64 @@
+# Questions refer to their validators by the names they are registered under
+# in bitter.validation instead of pickling them
+
+import json
+import pickle
+
+from django.db import migrations, models
+
+
+def name_validators(apps, schema_editor):
+    Question = apps.get_model('kowhowse', 'Question')
+    db = schema_editor.connection.alias
+
+    questions = list(Question.objects.using(db).all())
+    for question in questions:
+        question.names = json.dumps([
+            f.__name__ for f in pickle.loads(bytes(question.validators))
+        ]) if question.validators else ''
+    Question.objects.using(db).bulk_update(questions, ['names'])
+
+
+def pickle_validators(apps, schema_editor):
+    from kowhowse.bitter.validation import VALIDATORS
+
+    Question = apps.get_model('kowhowse', 'Question')
+    db = schema_editor.connection.alias
+
+    questions = list(Question.objects.using(db).all())
+    for question in questions:
+        question.validators = pickle.dumps([
+            VALIDATORS[name] for name in json.loads(question.names or '[]')
+        ])
+    Question.objects.using(db).bulk_update(questions, ['validators'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0006_mushra_response_bits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='names',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='validators',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RunPython(name_validators, pickle_validators),
+        migrations.RemoveField(
+            model_name='question',
+            name='validators',
+        ),
+        migrations.RenameField(
+            model_name='question',
+            old_name='names',
+            new_name='validators',
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+def mark_answered(apps, schema_editor):
+    db = schema_editor.connection.alias
+    for name in ['AbResponse', 'AbxResponse']:
+        apps.get_model('kowhowse', name).objects.using(db)\
+            .filter(value__isnull=False)\
+            .update(answered=True)
+    MosResponse = apps.get_model('kowhowse', 'MosResponse')
+    MosResponse.objects.using(db)\
+        .filter(bits__isnull=False)\
+        .exclude(bits__value__isnull=True)\
+        .update(answered=True)
+    # MUSHRA responses couldn't be cooked before, so none are answered
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0007_validator_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abresponse',
+            name='answered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='abxresponse',
+            name='answered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='mosresponse',
+            name='answered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='mushraresponse',
+            name='answered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_answered, migrations.RunPython.noop),
+    ]
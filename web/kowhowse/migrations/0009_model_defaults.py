@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:28
+
+import django.core.validators
+from django.db import migrations, models
+import kowhowse.bitter.definition
+import kowhowse.bitter.instantiation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0008_response_answered'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='abfeed',
+            name='seed',
+            field=models.IntegerField(default=kowhowse.bitter.instantiation.random_seed),
+        ),
+        migrations.AlterField(
+            model_name='abxfeed',
+            name='seed',
+            field=models.IntegerField(default=kowhowse.bitter.instantiation.random_seed),
+        ),
+        migrations.AlterField(
+            model_name='mosfeed',
+            name='seed',
+            field=models.IntegerField(default=kowhowse.bitter.instantiation.random_seed),
+        ),
+        migrations.AlterField(
+            model_name='mushrafeed',
+            name='seed',
+            field=models.IntegerField(default=kowhowse.bitter.instantiation.random_seed),
+        ),
+        migrations.AlterField(
+            model_name='survey',
+            name='uid',
+            field=models.CharField(default=kowhowse.bitter.definition.generate_uid, max_length=4, primary_key=True, serialize=False, validators=[django.core.validators.MinLengthValidator(4)]),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:29
+
+from random import Random
+
+from django.db import migrations, models
+
+
+def shuffle_ab(seed, samples):
+    return Random(seed).sample(samples, 2)
+
+
+def shuffle_abx(seed, samples):
+    r = Random(seed)
+    return r.sample(samples, 2) + [r.choice(samples)]
+
+
+def shuffle_mushra(seed, samples):
+    return Random(seed).sample(samples, len(samples))
+
+
+def map_feeds(apps, schema_editor):
+    # Drawn from the seed and the samples in id order, as PreferenceFeed.map
+    # does
+    db = schema_editor.connection.alias
+    for name, shuffle in [('AbFeed', shuffle_ab),
+                          ('AbxFeed', shuffle_abx),
+                          ('MushraFeed', shuffle_mushra)]:
+        Feed = apps.get_model('kowhowse', name)
+        feeds = list(Feed.objects.using(db).prefetch_related('samples'))
+        for feed in feeds:
+            samples = sorted(feed.samples.all(), key=lambda s: s.id)
+            if samples:
+                feed.mapping = ','.join(
+                    str(sample.id) for sample in shuffle(feed.seed, samples)
+                )
+        Feed.objects.using(db).bulk_update(feeds, ['mapping'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0009_model_defaults'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abfeed',
+            name='mapping',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='abxfeed',
+            name='mapping',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='mushrafeed',
+            name='mapping',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(map_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:32
+
+import os
+import json
+import wave
+import shutil
+import hashlib
+import subprocess
+
+from django.db import migrations, models
+
+
+def probe_audio(path):
+    # A copy of bitter.definition.probe_audio as of this migration
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            checksum.update(chunk)
+    meta = {
+        'mime_type': 'audio/' + str(path).split('.')[-1],
+        'size': os.path.getsize(path),
+        'checksum': checksum.hexdigest(),
+        'duration': None,
+        'sample_rate': None,
+        'channels': None
+    }
+
+    try:
+        with wave.open(str(path), 'rb') as w:
+            meta['sample_rate'] = w.getframerate()
+            meta['channels'] = w.getnchannels()
+            meta['duration'] = w.getnframes() / w.getframerate()
+        return meta
+    except (wave.Error, EOFError):
+        pass
+
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe is not None:
+        try:
+            out = subprocess.run(
+                [ffprobe, '-v', 'error', '-select_streams', 'a:0',
+                 '-show_entries', 'stream=sample_rate,channels:format=duration',
+                 '-of', 'json', str(path)],
+                capture_output=True, check=True, timeout=60
+            ).stdout
+            info = json.loads(out)
+            stream = info['streams'][0]
+            meta['sample_rate'] = int(stream['sample_rate'])
+            meta['channels'] = int(stream['channels'])
+            meta['duration'] = float(info['format']['duration'])
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError,
+                IndexError):
+            pass
+    return meta
+
+
+def probe_audios(apps, schema_editor):
+    # Audio created before metadata was probed at ingestion
+    db = schema_editor.connection.alias
+    Audio = apps.get_model('kowhowse', 'Audio')
+    audios = []
+    for audio in Audio.objects.using(db).all():
+        try:
+            meta = probe_audio(audio.data.path)
+        except OSError:
+            continue
+        for k, v in meta.items():
+            setattr(audio, k, v)
+        audios.append(audio)
+    Audio.objects.using(db).bulk_update(
+        audios,
+        ['mime_type', 'size', 'checksum', 'duration', 'sample_rate', 'channels']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0010_feed_mapping'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audio',
+            name='channels',
+            field=models.PositiveSmallIntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='checksum',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='duration',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='mime_type',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='sample_rate',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='size',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+        migrations.RunPython(probe_audios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kowhowse', '0011_audio_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audio',
+            name='variants',
+            field=models.TextField(default='[]'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # from .utils import *
 from .radio import *
+from .fragment import *
 from .foldy import *
 from .nav import *
 from .table import *
@@ -6,6 +6,11 @@ def playbutton(audio, _class=''):
     return {'audio': audio, 'class': _class}
 
 
+@register.inclusion_tag('widgets/prefetch.html')
+def prefetch(audios):
+    return {'audios': audios}
+
+
 @register.inclusion_tag('widgets/volume.html')
 def volume():
     return {}
@@ -0,0 +1,61 @@
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.base import FilterExpression
+from django.utils.translation import get_language
+from .utils import *
+from .radio import check
+
+
+def fragment_cache():
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+@register.tag
+def fragment(parser, token):
+    tag, args, kwargs = parse_block_tag(parser, token)
+
+    usage = '{{% {tag} name=<str> key=<str> [checked=<list>] %}}'\
+                '<content>'\
+            '{{% -{tag} %}}'.format(tag=tag)
+
+    if 'name' not in kwargs.keys() or \
+       'key' not in kwargs.keys():
+        raise template.TemplateSyntaxError("Usage: "+usage)
+
+    nodelist = parser.parse(('-'+tag,))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        name=kwargs['name'],
+        key=kwargs['key'],
+        checked=kwargs.get('checked', FilterExpression("None", parser))
+    )
+
+
+class FragmentNode(template.Node):
+    """
+    Renders content once per name and key and serves it from the
+    template_fragments cache afterwards. Content must not depend on anything
+    but the key; the radio buttons listed in checked are marked on every
+    render.
+    """
+    def __init__(self, nodelist, name, key, checked):
+        self.nodelist = nodelist
+        self.name = name
+        self.key = key
+        self.checked = checked
+
+    def render(self, context):
+        key = make_template_fragment_key(
+            self.name.resolve(context),
+            [self.key.resolve(context), get_language()]
+        )
+        cache = fragment_cache()
+        output = cache.get(key)
+        if output is None:
+            output = self.nodelist.render(context)
+            cache.set(key, output)
+        return check(output, self.checked.resolve(context) or [])
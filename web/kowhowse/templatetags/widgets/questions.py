@@ -22,14 +22,10 @@ def aboption(value, response):
 
 @register.inclusion_tag('front/aboptions.html')
 def aboptions(feed):
-    response = feed.response.value if hasattr(feed, 'response') else None
+    # Rendered without the response; see checked
     return dict(
         options=[
-            dict(
-                value=k,
-                active=v == response,
-                audio=v
-            )
+            dict(value=k, audio=v)
             for k, v in feed.choices()
         ]
     )
@@ -37,32 +33,45 @@ def aboptions(feed):
 
 @register.inclusion_tag('front/mosscales.html')
 def mosscales(feed):
+    # Scales come from the registry, and the response is left out; see checked
     return dict(
         scales=[
             dict(
-                name=f'response-{scale.id}',
+                name=scale.response_str,
                 description=scale.description,
                 levels=[
-                    dict(
-                        value=level.id,
-                        description=level.description,
-                        active=(
-                            feed.response.bits.get(scale_id=scale.id).value == level
-                            if (
-                                hasattr(feed, 'response') and
-                                feed.response.bits.exists() and 
-                                feed.response.bits.get(scale_id=scale.id).value is not None
-                            ) else False
-                        )
-                    )
-                    for level in scale.levels.order_by('value')
+                    dict(value=level.id, description=level.description)
+                    for level in scale.choices()
                 ]
             )
-            for scale in feed.question.scales.order_by('id')
+            for scale in scale_registry.scales(feed.question_id)
         ]
     )
 
 
+@register.filter
+def checked(feed):
+    """
+    Ids of the radio buttons that the response to feed has checked, to be
+    marked on the cached markup of aboptions and mosscales.
+    """
+    if not hasattr(feed, 'response'):
+        return []
+    if isinstance(feed, (AbFeed, AbxFeed)):
+        return [
+            f'response-{k}'
+            for k, v in feed.choices()
+            if v.id == feed.response.value_id
+        ]
+    if isinstance(feed, MosFeed):
+        return [
+            f'response-{bit.scale_id}-{bit.value_id}'
+            for bit in feed.response.bits.all()
+            if bit.value_id is not None
+        ]
+    return []
+
+
 @register.inclusion_tag('front/mushrastimulus.html')
 def mushrastimulus(name, audio):
     return {'name': name, 'audio': audio}
@@ -1,3 +1,5 @@
+import re
+
 from .utils import *
 from django.utils.safestring import mark_safe
 
@@ -81,3 +83,20 @@ class RadioNode(template.Node):
             class_=class_ if class_ else ""
         ))
         return output
+
+
+def check(html, ids):
+    """
+    Mark the radio buttons with the given ids as checked in html rendered by
+    RadioNode, so that the buttons can be rendered once and reused.
+    """
+    for id_ in ids:
+        html = re.sub(
+            r'<label class="btn (?P<class>[^"]*)">'
+            r'<input type="radio" (?P<attrs>[^>]*id="{}" [^>]*)>'
+            .format(re.escape(str(id_))),
+            r'<label class="btn active\g<class>">'
+            r'<input type="radio" \g<attrs> checked>',
+            html
+        )
+    return mark_safe(html)
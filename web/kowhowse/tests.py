@@ -1,3 +1,632 @@
-from django.test import TestCase
+import os
+import json
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .bitter import *
+from .bitter.instruction import InstructionCache
+from .logic import allocate, materialize, materialize_all
+
+
+def build_survey():
+    """
+    A survey with one section per question type and a closing End section.
+    Audio is referred to by name only and instructions are left out, so no
+    file needs to exist.
+    """
+    survey = Survey.objects.create(description='Survey', public=True)
+    system = System.objects.create(description='System')
+
+    def audio(name, role=Audio.STIMULUS):
+        return Audio.objects.create(
+            description=name, system=system,
+            data=f'audio/{name}.wav', role=role
+        )
+
+    def section(name):
+        return Section.objects.create(survey=survey, description=name)
+
+    for c in [AbQuestion, AbxQuestion]:
+        question = c.objects.create(
+            section=section(c.__name__), description=c.__name__
+        )
+        question.samples.set([audio(f'{c.__name__}-{k}') for k in range(2)])
+
+    question = MosQuestion.objects.create(
+        section=section('MosQuestion'), description='MosQuestion'
+    )
+    question.samples.set([audio('MosQuestion')])
+    for name in ['Quality', 'Naturalness']:
+        scale = MosScale.objects.create(description=name)
+        for value in range(1, 6):
+            MosLevel.objects.create(
+                scale=scale, value=value, description=str(value)
+            )
+        question.scales.add(scale)
+
+    question = MushraQuestion.objects.create(
+        section=section('MushraQuestion'), description='MushraQuestion'
+    )
+    question.samples.set(
+        [audio('MushraQuestion-R', Audio.REFERENCE),
+         audio('MushraQuestion-A', Audio.ANCHOR)] +
+        [audio(f'MushraQuestion-S{k}') for k in range(3)]
+    )
+
+    End.objects.create(survey=survey, description='End')
+    return survey
+
+
+class QuestionsViewQueriesTest(TestCase):
+    """
+    Rendering a page reads the session, the subject and the feed with the
+    relations in its prefetch plan, and nothing else; none of this may
+    depend on the number of samples, scales or levels.
+    """
+    # Session, subject, page species, feed with its select_related, feed of
+    # the next page; its samples take one more query if it has any
+    BASE = 5
+    # Queries for the prefetch_related plan of each feed type
+    PREFETCH = {
+        'SectionFeed': 0,
+        'AbFeed': 1,
+        'AbxFeed': 1,
+        'MosFeed': 1,
+        'MushraFeed': 2
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=False)
+
+    def setUp(self):
+        session = self.client.session
+        session['subject'] = self.subject.id
+        session.save()
+        self.url = reverse(
+            'front:questions', kwargs={'survey': self.survey.uid}
+        )
+
+    def test_queries_per_feed(self):
+        species = list(
+            self.subject.pages.order_by('position')
+                              .values_list('position', 'feed__species')
+        )
+        tested = set()
+        for position, s in species:
+            upcoming = position + 1 < len(species) and \
+                species[position + 1][1] != 'SectionFeed'
+            with self.subTest(species=s):
+                self.subject.flip_to(position)
+                with self.assertNumQueries(
+                        self.BASE + upcoming + self.PREFETCH[s]):
+                    response = self.client.get(self.url)
+                self.assertEqual(response.status_code, 200)
+            tested.add(s)
+        self.assertEqual(tested, set(self.PREFETCH))
+
+
+class ReadOnlyTest(TestCase):
+    """
+    Pages that are only looked at must not write to the database.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=False)
+        # Answer everything so that reads go through cooked responses too
+        for feed in resolve(cls.subject.pages.exclude(
+                feed__species='SectionFeed')):
+            if isinstance(feed, (AbFeed, AbxFeed)):
+                ingredient = 'A'
+            elif isinstance(feed, MosFeed):
+                ingredient = {
+                    scale.id: next(scale.choices()).id
+                    for scale in feed.question.scales.all()
+                }
+            else:
+                ingredient = {
+                    k: 100 if k == 0 else 0 for k, _ in feed.choices()
+                }
+            Response.cook(feed, ingredient)
+        cls.user = User.objects.create_user(
+            'staff', password='staff', is_staff=True
+        )
+
+    def assertNoWrites(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        writes = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].split(None, 1)[0].upper() in
+            ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+        ]
+        self.assertEqual(writes, [], url)
+
+    def test_front(self):
+        session = self.client.session
+        session['subject'] = self.subject.id
+        session.save()
+        uid = self.survey.uid
+
+        self.assertNoWrites(reverse('front:survey', kwargs={'survey': uid}))
+        self.assertNoWrites(reverse('front:bundle', kwargs={'survey': uid}))
+        for position in range(self.subject.num_pages):
+            self.subject.flip_to(position)
+            for name in ['front:questions', 'front:answer']:
+                with self.subTest(position=position, view=name):
+                    self.assertNoWrites(reverse(name, kwargs={'survey': uid}))
+
+    def test_back(self):
+        self.client.force_login(self.user)
+        self.assertNoWrites(reverse('back:index'))
+        self.assertNoWrites(
+            reverse('back:analysis', kwargs={'survey': self.survey.uid})
+        )
+
+
+class CookTest(TestCase):
+    """
+    Cooking stores valid answers and leaves responses as they were when
+    validation fails.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=False)
+
+    def feed(self, species):
+        return next(
+            feed for feed in resolve(self.subject.pages.all())
+            if feed.species == species
+        )
+
+    def test_mushra(self):
+        feed = self.feed('MushraFeed')
+        ingredient = {k: 100 if k == 0 else 0 for k, _ in feed.choices()}
+        Response.cook(feed, ingredient)
+
+        response = MushraResponse.objects.get(feed=feed)
+        self.assertTrue(response.answered)
+        self.assertEqual(
+            {bit.sample_id: bit.value for bit in response.bits.all()},
+            {v.id: ingredient[k] for k, v in feed.choices()}
+        )
+
+    def test_mushra_unprefetched(self):
+        # Validation must see the submitted values without the bits having
+        # been prefetched with the feed
+        feed = MushraFeed.objects.get(pk=self.feed('MushraFeed').pk)
+        ingredient = {k: 100 if k == 0 else 0 for k, _ in feed.choices()}
+        Response.cook(feed, ingredient)
+        self.assertTrue(MushraResponse.objects.get(feed=feed).answered)
+
+    def test_stale_copies(self):
+        # Two submissions of one answer, each with the feed as it was before
+        # either was cooked, count it once
+        page = self.feed('AbFeed').page
+        first, second = [
+            resolve(self.subject.pages.filter(pk=page.pk))[0]
+            for _ in range(2)
+        ]
+        Response.cook(first, 'A')
+        Response.cook(second, 'A')
+        self.assertEqual(
+            Subject.objects.get(pk=self.subject.pk).num_answered, 1
+        )
+        self.assertEqual(
+            SurveyStats.objects.get(survey=self.survey).num_ab_responses, 1
+        )
+
+        Response.cook(first, None)
+        self.assertEqual(
+            Subject.objects.get(pk=self.subject.pk).num_answered, 1
+        )
+
+    def test_mushra_invalid(self):
+        feed = self.feed('MushraFeed')
+        with self.assertRaises(ValidationError):
+            Response.cook(feed, {k: 50 for k, _ in feed.choices()})
+
+        response = MushraResponse.objects.get(feed=feed)
+        self.assertFalse(response.answered)
+        self.assertEqual(
+            {bit.value for bit in response.bits.all()},
+            {MushraResponseBit._meta.get_field('value').default}
+        )
+        self.assertEqual(
+            Subject.objects.get(pk=self.subject.pk).num_answered, 0
+        )
+
+    def test_mos(self):
+        feed = self.feed('MosFeed')
+        ingredient = {
+            scale.id: list(scale.choices())[-1].id
+            for scale in feed.question.scales.all()
+        }
+        Response.cook(feed, ingredient)
+
+        response = MosResponse.objects.get(feed=feed)
+        self.assertTrue(response.answered)
+        self.assertEqual(
+            {bit.scale_id: bit.value_id for bit in response.bits.all()},
+            ingredient
+        )
+        self.assertEqual(
+            Subject.objects.get(pk=self.subject.pk).num_answered, 1
+        )
+
+    def test_mos_invalid(self):
+        feed = self.feed('MosFeed')
+        with self.assertRaises(ValidationError):
+            Response.cook(feed, {feed.question.scales.first().id: 0})
+        self.assertFalse(MosResponse.objects.get(feed=feed).answered)
+
+
+class AllocationTest(TestCase):
+    """
+    Allocation creates every page up front or, lazily, as pages are reached,
+    and the presentation order of each feed follows from its seed.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+
+    def subject(self, lazy):
+        subject = Subject.objects.create(
+            survey=self.survey, description='Subject'
+        )
+        allocate(self.survey, subject, lazy=lazy)
+        return subject
+
+    def test_lazy(self):
+        subject = self.subject(lazy=True)
+        self.assertEqual(subject.num_pages, len(subject.planned_pages))
+        self.assertEqual(subject.pages.count(), 0)
+
+        for position, entry in enumerate(subject.planned_pages):
+            subject.flip_to(position)
+            self.assertEqual(subject.current_feed.species, entry[0])
+            self.assertEqual(subject.pages.count(), position + 1)
+        self.assertEqual(
+            self.subject(lazy=False).pages.count(), subject.num_pages
+        )
+
+    def test_concurrent_materialize(self):
+        # A request that reaches a page another one has just created gets
+        # that page instead of an error
+        subject = self.subject(lazy=True)
+        page = materialize(subject, 1)
+        self.assertEqual(materialize(subject, 1), page)
+        materialize_all(subject)
+        self.assertEqual(
+            list(subject.pages.order_by('position')
+                 .values_list('position', flat=True)),
+            list(range(subject.num_pages))
+        )
+
+    def test_samples_at(self):
+        subject = self.subject(lazy=False)
+        for feed in resolve(subject.pages.all()):
+            if isinstance(feed, MosFeed):
+                expected = {feed.sample_id}
+            elif isinstance(feed, PreferenceFeed):
+                expected = {sample.id for sample in feed.samples.all()}
+            else:
+                expected = set()
+            with self.subTest(species=feed.species):
+                self.assertEqual(
+                    set(subject.samples_at(feed.page.position)
+                        .values_list('id', flat=True)),
+                    expected
+                )
+        self.assertFalse(subject.samples_at(subject.num_pages).exists())
+
+    def test_mapping(self):
+        self.subject(lazy=False)
+        feeds = [
+            feed for feed in resolve(Page.objects.all())
+            if isinstance(feed, PreferenceFeed)
+        ]
+        self.assertEqual(len(feeds), 3)
+        for feed in feeds:
+            samples = sorted(feed.samples.all(), key=lambda s: s.id)
+            self.assertEqual(
+                feed.mapping,
+                ','.join(str(s.id) for s in feed.shuffle(samples))
+            )
+
+
+class InstructionCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+
+    def test_warm_once(self):
+        cache = InstructionCache(16)
+        cache.warm(self.survey)
+        with self.assertNumQueries(0):
+            cache.warm(self.survey)
+
+
+class TallyTest(TestCase):
+    """
+    Answered and completed counts of subjects and surveys follow the
+    responses as they are answered and unanswered.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=False)
+
+    def counts(self):
+        subject = Subject.objects.get(pk=self.subject.pk)
+        stats = SurveyStats.objects.get(survey=self.survey)
+        return subject.num_answered, subject.completed, stats.num_complete
+
+    def test_tally(self):
+        pages = list(self.subject.pages.exclude(feed__species='SectionFeed'))
+        for n, page in enumerate(pages, 1):
+            Subject.tally(page.id, page.feed.species, 1)
+            self.assertEqual(
+                self.counts(), (n, n == len(pages), n // len(pages))
+            )
+
+        Subject.tally(pages[0].id, pages[0].feed.species, -1)
+        self.assertEqual(self.counts(), (len(pages) - 1, False, 0))
+        Subject.tally(pages[0].id, pages[0].feed.species, 1)
+        self.assertEqual(self.counts(), (len(pages), True, 1))
+        self.assertEqual(
+            SurveyStats.objects.get(survey=self.survey).num_ab_responses, 1
+        )
+
+
+class ScaleRegistryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+
+    def setUp(self):
+        scale_registry.invalidate()
+
+    def test_lookups(self):
+        question = MosQuestion.objects.get()
+        self.assertEqual(
+            [scale.id for scale in scale_registry.scales(question.id)],
+            sorted(question.scales.values_list('id', flat=True))
+        )
+        # Known and unknown ids are answered from memory from then on
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                scale_registry.scales(question.id)
+        scale_registry.scales(0)
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assertEqual(scale_registry.scales(0), [])
+
+    def test_invalidate(self):
+        question = MosQuestion.objects.get()
+        scale_registry.scales(question.id)
+        question.scales.remove(question.scales.first())
+        self.assertEqual(len(scale_registry.scales(question.id)), 1)
+
+
+class AnswerViewTest(TestCase):
+    """
+    The answer endpoint cooks well-formed answers and turns away anything
+    else with a 400, without moving the subject on.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=False)
+        cls.positions = dict(
+            cls.subject.pages.values_list('feed__species', 'position')
+        )
+
+    def setUp(self):
+        session = self.client.session
+        session['subject'] = self.subject.id
+        session.save()
+        self.url = reverse('front:answer', kwargs={'survey': self.survey.uid})
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, json.dumps(payload), content_type='application/json'
+        )
+
+    def flip_to(self, position):
+        self.subject.refresh_from_db()
+        self.subject.flip_to(position)
+
+    def cursor(self):
+        return Subject.objects.get(pk=self.subject.pk).cursor
+
+    def test_answer(self):
+        self.flip_to(self.positions['AbFeed'])
+        response = self.post({'response': 'B', 'page': 'next'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cursor(), self.positions['AbFeed'] + 1)
+        self.assertEqual(
+            response.json()['feed']['position'], self.positions['AbFeed'] + 1
+        )
+        self.assertTrue(
+            AbResponse.objects.get(feed__page__subject=self.subject).answered
+        )
+
+    def test_malformed(self):
+        cases = [
+            ('AbFeed', ['response', 'A']),
+            ('AbFeed', {'response': 'Q', 'page': 'next'}),
+            ('AbFeed', {'response': {'A': 1}, 'page': 'next'}),
+            ('AbxFeed', {'response': 'X', 'page': 'next'}),
+            ('MosFeed', {'response': [1, 2], 'page': 'next'}),
+            ('MosFeed', {'response': {'1': [1]}, 'page': 'next'}),
+            ('MushraFeed', {'response': 'A', 'page': 'next'}),
+            ('MushraFeed', {'response': {'-1': 100}, 'page': 'next'}),
+        ]
+        for species, payload in cases:
+            with self.subTest(species=species, payload=payload):
+                self.flip_to(self.positions[species])
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(self.cursor(), self.positions[species])
+        self.assertEqual(
+            Subject.objects.get(pk=self.subject.pk).num_answered, 0
+        )
+
+
+class BundleViewTest(TestCase):
+    """
+    The bundle lists every page and cooks batches of answers, reporting
+    the entries it couldn't use by feed.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.survey = build_survey()
+        cls.subject = Subject.objects.create(
+            survey=cls.survey, description='Subject'
+        )
+        allocate(cls.survey, cls.subject, lazy=True)
+
+    def setUp(self):
+        session = self.client.session
+        session['subject'] = self.subject.id
+        session.save()
+        self.url = reverse('front:bundle', kwargs={'survey': self.survey.uid})
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, json.dumps(payload), content_type='application/json'
+        )
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        feeds = response.json()['feeds']
+        self.assertEqual(
+            [feed['position'] for feed in feeds],
+            list(range(self.subject.num_pages))
+        )
+
+    def test_post(self):
+        self.client.get(self.url)
+        feeds = {
+            feed.species: feed
+            for feed in resolve(self.subject.pages.all())
+        }
+        response = self.post({
+            'responses': [
+                {'feed': feeds['AbFeed'].id, 'response': 'A'},
+                {'feed': feeds['AbxFeed'].id, 'response': 'Q'},
+                {'feed': feeds['MosFeed'].id, 'response': 3},
+                {'feed': 0, 'response': 'A'},
+            ],
+            'position': 2
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.json()['errors']),
+            {str(feeds['AbxFeed'].id), str(feeds['MosFeed'].id), '0'}
+        )
+        subject = Subject.objects.get(pk=self.subject.pk)
+        self.assertEqual(subject.num_answered, 1)
+        self.assertEqual(subject.cursor, 2)
+
+    def test_malformed(self):
+        for payload in [[], {'responses': 'A'}, {'responses': [1]},
+                        {'responses': [{'response': 'A'}]}]:
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+
+class MediaViewTest(TestCase):
+    """
+    Media is served whole or by byte range, with validators for caching.
+    """
+    DATA = bytes(range(100))
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, 'audio'))
+        with open(os.path.join(tmp.name, 'audio', 'a.wav'), 'wb') as f:
+            f.write(self.DATA)
+        settings = override_settings(MEDIA_ROOT=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = '/media/audio/a.wav'
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        content = b''.join(response.streaming_content) \
+            if response.streaming else response.content
+        return response, content
+
+    def test_whole(self):
+        response, content = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, self.DATA)
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(response['Content-Type'], 'audio/wav')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_ranges(self):
+        for header, first, last in [('bytes=10-19', 10, 19),
+                                    ('bytes=90-', 90, 99),
+                                    ('bytes=-5', 95, 99),
+                                    ('bytes=0-1000', 0, 99)]:
+            with self.subTest(range=header):
+                response, content = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(content, self.DATA[first:last + 1])
+                self.assertEqual(
+                    response['Content-Range'], f'bytes {first}-{last}/100'
+                )
+                self.assertEqual(
+                    response['Content-Length'], str(last - first + 1)
+                )
+
+        response, _ = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+        # A range for another version of the file gets the whole file
+        response, content = self.get(
+            HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, self.DATA)
+
+    def test_not_found(self):
+        for url in ['/media/audio/b.wav', '/media/audio/',
+                    '/media/%2e%2e/settings.py']:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
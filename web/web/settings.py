@@ -124,6 +124,46 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# How long browsers may keep media, served by kowhowse.media, without
+# revalidating it
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+
 
 LOGIN_URL = '/backroom/login'
 # LOGIN_REDIRECT_URL = '/backroom'
+
+
+# Number of pre-allocated subjects to keep ready per survey; 0 disables the
+# pool. The preallocate command tops it up, e.g. from a task runner
+SUBJECT_POOL_SIZE = 0
+
+# Also refill the pool on a background thread after each claim. Only one
+# refill runs per survey and process, so several workers may overshoot, and
+# on SQLite the refills compete with listeners for the write lock
+SUBJECT_POOL_REFILL_ON_CLAIM = False
+
+# Create a subject's pages as they are reached instead of all at the start
+LAZY_ALLOCATION = False
+
+# Rendered question page fragments, see the fragment widget. LocMemCache evicts
+# the least recently used entries once MAX_ENTRIES is reached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template_fragments',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Number of instruction files kept in memory per process
+INSTRUCTION_CACHE_SIZE = 1024
+
+# Compressed audio variants produced by createsurvey and encodeaudio when an
+# encoder is installed; 'flac' is lossless, 'opus' is much smaller but lossy
+AUDIO_ENCODINGS = ['flac']